@@ -0,0 +1,321 @@
+import os
+import sys
+import json
+import random
+from argparse import ArgumentParser
+from copy import copy
+from datetime import datetime
+from threading import Thread
+from time import perf_counter, sleep
+from typing import Dict, List
+
+# 无界面运行，必须在导入PySide6之前设置
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtWidgets, QtCore
+
+from vnpy.event import EventEngine, Event
+from vnpy.trader.constant import Exchange, Direction, Offset, Status, OrderType
+from vnpy.trader.event import EVENT_TICK, EVENT_ORDER, EVENT_TRADE, EVENT_LOG
+from vnpy.trader.object import TickData, OrderData, TradeData, LogData
+
+from monitor import TickMonitor, MarketMonitor, OrderMonitor, TradeMonitor, LogMonitor
+from bridge import EventBridge
+from profiler import HandlerProfiler
+
+
+# 合成事件的比例（其余为行情）
+order_ratio: float = 0.05
+trade_ratio: float = 0.02
+log_ratio: float = 0.01
+
+# 监控控件批量刷新间隔（毫秒），与主窗口一致
+batch_interval: int = 50
+
+
+def get_peak_rss() -> float:
+    """查询进程的内存峰值（MB），无法查询时返回0"""
+    try:
+        import resource
+        peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        
+        # macOS返回字节，Linux返回KB
+        if sys.platform == "darwin":
+            return peak / 1024 / 1024
+        return peak / 1024
+    except ImportError:
+        pass
+    
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1024 / 1024
+    except ImportError:
+        return 0
+
+
+class EventGenerator:
+    """按固定速率生成合成的行情、委托、成交和日志事件"""
+    
+    def __init__(self, event_engine: EventEngine, symbols: int, rate: int) -> None:
+        """构造函数"""
+        self.event_engine: EventEngine = event_engine
+        self.rate: int = rate
+        
+        self.symbols: List[str] = [f"BM{i:04d}" for i in range(symbols)]
+        self.prices: Dict[str, float] = {symbol: 4000.0 for symbol in self.symbols}
+        self.open_interests: Dict[str, float] = {symbol: 10000 for symbol in self.symbols}
+        
+        # 未完成的委托，后续生成状态更新和成交
+        self.orders: List[OrderData] = []
+        self.order_count: int = 0
+        self.trade_count: int = 0
+        
+        self.counts: Dict[str, int] = {
+            EVENT_TICK: 0,
+            EVENT_ORDER: 0,
+            EVENT_TRADE: 0,
+            EVENT_LOG: 0
+        }
+        
+        self.active: bool = False
+        self.thread: Thread = Thread(target=self.run, daemon=True)
+    
+    def start(self) -> None:
+        """启动生成线程"""
+        self.active = True
+        self.thread.start()
+    
+    def stop(self) -> None:
+        """停止生成线程"""
+        self.active = False
+        self.thread.join()
+    
+    def run(self) -> None:
+        """按速率补足应生成的事件数量"""
+        start: float = perf_counter()
+        count: int = 0
+        
+        while self.active:
+            target: int = int((perf_counter() - start) * self.rate)
+            
+            while count < target:
+                self.put_event()
+                count += 1
+            
+            sleep(0.001)
+    
+    def put_event(self) -> None:
+        """随机生成一个事件"""
+        n: float = random.random()
+        
+        if n < log_ratio:
+            event: Event = Event(EVENT_LOG, LogData(gateway_name="BENCH", msg=f"合成日志{self.counts[EVENT_LOG]}"))
+        elif n < log_ratio + trade_ratio and self.orders:
+            event: Event = Event(EVENT_TRADE, self.new_trade())
+        elif n < log_ratio + trade_ratio + order_ratio:
+            event: Event = Event(EVENT_ORDER, self.new_order())
+        else:
+            event: Event = Event(EVENT_TICK, self.new_tick())
+        
+        self.counts[event.type] += 1
+        self.event_engine.put(event)
+    
+    def new_tick(self) -> TickData:
+        """生成随机游走的行情"""
+        symbol: str = random.choice(self.symbols)
+        
+        price: float = self.prices[symbol] + random.choice((-0.2, 0, 0.2))
+        self.prices[symbol] = price
+        
+        open_interest: float = self.open_interests[symbol] + random.randint(-2, 2)
+        self.open_interests[symbol] = open_interest
+        
+        return TickData(
+            gateway_name="BENCH",
+            symbol=symbol,
+            exchange=Exchange.CFFEX,
+            datetime=datetime.now(),
+            volume=random.randint(1, 100),
+            open_interest=open_interest,
+            last_price=price,
+            bid_price_1=price - 0.2,
+            ask_price_1=price + 0.2,
+            bid_volume_1=random.randint(1, 50),
+            ask_volume_1=random.randint(1, 50)
+        )
+    
+    def new_order(self) -> OrderData:
+        """生成新委托，或更新已有委托的状态"""
+        if self.orders and random.random() < 0.5:
+            # 和接口一样，每次推送新的数据对象
+            order: OrderData = random.choice(self.orders)
+            self.orders.remove(order)
+            
+            order = copy(order)
+            order.status = Status.CANCELLED
+            return order
+        
+        self.order_count += 1
+        symbol: str = random.choice(self.symbols)
+        
+        order: OrderData = OrderData(
+            gateway_name="BENCH",
+            symbol=symbol,
+            exchange=Exchange.CFFEX,
+            orderid=str(self.order_count),
+            type=OrderType.LIMIT,
+            direction=random.choice((Direction.LONG, Direction.SHORT)),
+            offset=Offset.OPEN,
+            price=self.prices[symbol],
+            volume=1,
+            status=Status.NOTTRADED,
+            datetime=datetime.now()
+        )
+        self.orders.append(order)
+        return order
+    
+    def new_trade(self) -> TradeData:
+        """成交一笔未完成的委托"""
+        order: OrderData = self.orders.pop(0)
+        self.trade_count += 1
+        
+        return TradeData(
+            gateway_name="BENCH",
+            symbol=order.symbol,
+            exchange=order.exchange,
+            orderid=order.orderid,
+            tradeid=str(self.trade_count),
+            direction=order.direction,
+            offset=order.offset,
+            price=order.price,
+            volume=order.volume,
+            datetime=datetime.now()
+        )
+
+
+def run_benchmark(symbols: int, rate: int, duration: float) -> dict:
+    """运行一轮合成负载测试，返回统计结果"""
+    qapp = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    
+    event_engine: EventEngine = EventEngine()
+    profiler: HandlerProfiler = HandlerProfiler()
+    bridge: EventBridge = EventBridge(event_engine, profiler=profiler)
+    
+    # 监控控件需要显示，否则会跳过绘制
+    monitors: list = [
+        TickMonitor(bridge, batch_interval),
+        MarketMonitor(bridge, batch_interval),
+        OrderMonitor(bridge),
+        TradeMonitor(bridge),
+        LogMonitor(bridge, batch_interval)
+    ]
+    
+    hbox = QtWidgets.QHBoxLayout()
+    for monitor in monitors:
+        hbox.addWidget(monitor)
+    
+    window = QtWidgets.QWidget()
+    window.setLayout(hbox)
+    window.resize(1600, 900)
+    window.show()
+    
+    event_engine.start()
+    generator: EventGenerator = EventGenerator(event_engine, symbols, rate)
+    
+    # 发送结束后等待积压的事件处理完毕
+    times: dict = {}
+    
+    def check_drained() -> None:
+        """积压处理完毕后退出事件循环"""
+        # 桥接已派发的事件可能还在各监控控件的批量缓存中等待刷新
+        busy: bool = any(
+            getattr(monitor, name, None)
+            for monitor in monitors
+            for name in ("pending_events", "dirty_data", "burst_data")
+        )
+        
+        received: int = bridge.event_count
+        if busy or received < sum(generator.counts.values()) or bridge.get_backpressure()["depth"]:
+            QtCore.QTimer.singleShot(10, check_drained)
+            return
+        times["drained"] = perf_counter()
+        qapp.quit()
+    
+    def stop_generator() -> None:
+        """停止生成事件"""
+        generator.stop()
+        times["stopped"] = perf_counter()
+        check_drained()
+    
+    times["start"] = perf_counter()
+    generator.start()
+    
+    QtCore.QTimer.singleShot(int(duration * 1000), stop_generator)
+    qapp.exec()
+    
+    event_engine.stop()
+    
+    # 汇总结果
+    elapsed: float = times["drained"] - times["start"]
+    generated: int = sum(generator.counts.values())
+    shed: int = bridge.shed_count
+    
+    handlers: List[dict] = []
+    for stats in profiler.get_stats():
+        handlers.append({
+            "type": stats["type"],
+            "handler": stats["handler"],
+            "count": stats["count"],
+            "total_ms": stats["total"],
+            "mean_ms": stats["mean"],
+            "max_ms": stats["max"]
+        })
+    
+    handler_total: float = sum(d["total_ms"] for d in handlers)
+    
+    result: dict = {
+        "datetime": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "qt": QtCore.qVersion(),
+        "symbols": symbols,
+        "target_rate": rate,
+        "duration": duration,
+        "events": generator.counts,
+        "generated": generated,
+        "shed": shed,
+        "drain_time": times["drained"] - times["stopped"],
+        "throughput": (generated - shed) / elapsed,
+        "peak_rss_mb": get_peak_rss(),
+        "mean_event_ms": handler_total / generated if generated else 0,
+        "handlers": handlers
+    }
+    
+    for monitor in monitors:
+        monitor.close()
+    window.close()
+    
+    return result
+
+
+def run() -> None:
+    """命令行入口"""
+    parser = ArgumentParser(description="监控控件合成负载测试")
+    parser.add_argument("--symbols", type=int, default=50, help="合约数量")
+    parser.add_argument("--rate", type=int, default=2000, help="每秒事件数")
+    parser.add_argument("--duration", type=float, default=10, help="持续时间（秒）")
+    parser.add_argument("--output", default="", help="结果JSON文件路径（默认输出到屏幕）")
+    args = parser.parse_args()
+    
+    result: dict = run_benchmark(args.symbols, args.rate, args.duration)
+    text: str = json.dumps(result, indent=4, ensure_ascii=False)
+    
+    if args.output:
+        with open(args.output, mode="w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,349 @@
+import sys
+import traceback
+from collections import defaultdict
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+from PySide6 import QtCore
+
+from vnpy.event import EventEngine, Event
+from vnpy.trader.event import EVENT_TICK, EVENT_ORDER, EVENT_TRADE
+
+from profiler import HandlerProfiler
+
+
+# 事件优先级通道，数字越小越先派发
+LANE_TRADING: int = 0
+LANE_NORMAL: int = 1
+LANE_MARKET: int = 2
+
+LANE_NAMES: List[str] = ["交易", "常规", "行情"]
+
+
+def get_lane(type: str) -> int:
+    """根据事件类型确定优先级通道（包括按代码细分的事件类型）"""
+    if type.startswith(EVENT_ORDER) or type.startswith(EVENT_TRADE):
+        return LANE_TRADING
+    elif type.startswith(EVENT_TICK):
+        return LANE_MARKET
+    return LANE_NORMAL
+
+
+def report_error(handler: Callable[[Event], None], event: Event) -> None:
+    """输出处理函数的异常信息（在except中调用），不影响其他事件的派发"""
+    name: str = getattr(handler, "__qualname__", repr(handler))
+    print(f"事件{event.type}的处理函数{name}出错", file=sys.stderr)
+    traceback.print_exc()
+
+
+class EventBridge(QtCore.QObject):
+    """事件引擎到GUI线程的统一桥接"""
+    
+    signal = QtCore.Signal()
+    
+    def __init__(
+        self,
+        event_engine: EventEngine,
+        interval: int = 16,
+        budget: float = 0.008,
+        capacity: int = 10000,
+        profiler: HandlerProfiler = None
+    ) -> None:
+        """构造函数"""
+        super().__init__()
+        
+        self.event_engine: EventEngine = event_engine
+        
+        # 传入性能分析器时，处理函数在注册时被包装计时
+        self.profiler: HandlerProfiler = profiler
+        self.wrappers: Dict[Tuple[str, Callable], Callable[[Event], None]] = {}
+        
+        # GUI线程中的事件处理函数
+        self.handlers: Dict[str, List[Callable[[Event], None]]] = defaultdict(list)
+        
+        # 事件类型到优先级通道的缓存
+        self.lanes: Dict[str, int] = {}
+        
+        # 事件引擎线程写入的各通道缓冲区，元素为（入队时间，事件）
+        self.buffers: List[List[Tuple[float, Event]]] = [[] for _ in LANE_NAMES]
+        self.lock: Lock = Lock()
+        self.posted: bool = False
+        
+        # 行情通道每帧的派发时间预算（秒），超出部分留到下一轮
+        self.budget: float = budget
+        self.backlog: List[Tuple[float, Event]] = []
+        self.backlog_size: int = 0
+        
+        # 行情通道容量，积压超出后每个合约只保留最新行情（其他通道从不丢弃）
+        self.capacity: int = capacity
+        self.latest_ticks: Dict[Tuple[str, str], Tuple[float, Event]] = {}
+        self.shed_count: int = 0
+        
+        # 各通道等待时间统计（统计窗口内）
+        self.wait_counts: List[int] = [0] * len(LANE_NAMES)
+        self.wait_totals: List[float] = [0.0] * len(LANE_NAMES)
+        self.wait_maxes: List[float] = [0.0] * len(LANE_NAMES)
+        self.max_depths: List[int] = [0] * len(LANE_NAMES)
+        
+        # 每帧最多派发一次（毫秒）
+        self.timer: QtCore.QTimer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.process_batch)
+        
+        self.signal.connect(self.timer.start)
+        
+        # 行情延时追踪器，抽样的事件由其计时派发
+        self.tracer = None
+        
+        # 统计计数
+        self.event_count: int = 0
+        self.signal_count: int = 0
+        self.delivery_count: int = 0
+        
+        self.last_counts: tuple = (0, 0, 0)
+        self.last_time: float = perf_counter()
+        
+    def register(self, type: str, handler: Callable[[Event], None]) -> None:
+        """注册GUI线程事件处理函数"""
+        handler_list: list = self.handlers[type]
+        
+        # 该类型的第一个处理函数，开始从事件引擎接收
+        if not handler_list:
+            self.event_engine.register(type, self.put)
+            
+        # 注册包装后的处理函数，同一函数只包装一次
+        if self.profiler:
+            key: Tuple[str, Callable] = (type, handler)
+            if key in self.wrappers:
+                return
+            handler = self.wrappers[key] = self.profiler.wrap(type, handler)
+            
+        if handler not in handler_list:
+            handler_list.append(handler)
+            
+    def wrap(self, type: str, handler: Callable) -> Callable:
+        """包装不经过派发的处理函数（如定时批量刷新），启用性能分析时计时"""
+        if self.profiler:
+            return self.profiler.wrap(type, handler)
+        return handler
+        
+    def unregister(self, type: str, handler: Callable[[Event], None]) -> None:
+        """注销GUI线程事件处理函数"""
+        if type not in self.handlers:
+            return
+        handler_list: list = self.handlers[type]
+        
+        if self.profiler:
+            handler = self.wrappers.pop((type, handler), None)
+        
+        if handler in handler_list:
+            handler_list.remove(handler)
+            
+        # 已经没有处理函数，停止从事件引擎接收
+        if not handler_list:
+            self.handlers.pop(type)
+            self.event_engine.unregister(type, self.put)
+        
+    def put(self, event: Event) -> None:
+        """接收事件（运行在事件引擎线程）"""
+        lane: int = self.lanes.get(event.type, None)
+        if lane is None:
+            lane = self.lanes[event.type] = get_lane(event.type)
+            
+        with self.lock:
+            market_depth: int = len(self.buffers[LANE_MARKET]) + self.backlog_size
+            
+            # 行情积压超出容量，同一合约的旧行情被新行情替换
+            if lane == LANE_MARKET and market_depth >= self.capacity:
+                key: Tuple[str, str] = (event.type, event.data.vt_symbol)
+                if key in self.latest_ticks:
+                    self.shed_count += 1
+                self.latest_ticks[key] = (perf_counter(), event)
+            else:
+                self.buffers[lane].append((perf_counter(), event))
+                
+            self.event_count += 1
+            
+            # 已经通知过GUI线程，等待其统一处理
+            if self.posted:
+                return
+            self.posted = True
+            self.signal_count += 1
+            
+        self.signal.emit()
+        
+    def process_batch(self) -> None:
+        """按优先级派发缓冲区中的事件（运行在GUI线程）"""
+        with self.lock:
+            buffers: List[List[Tuple[float, Event]]] = self.buffers
+            self.buffers = [[] for _ in LANE_NAMES]
+            self.posted = False
+            
+            latest_ticks: Dict[Tuple[str, str], Tuple[float, Event]] = self.latest_ticks
+            self.latest_ticks = {}
+            
+        # 上一轮未派发完的行情排在本轮行情之前，合并后的最新行情排在最后
+        if self.backlog:
+            buffers[LANE_MARKET] = self.backlog + buffers[LANE_MARKET]
+            self.backlog = []
+            
+        # 积压超出过容量，已排队的行情也按合约合并，只派发每个合约的最新行情
+        if latest_ticks:
+            buffers[LANE_MARKET] = self.collapse_ticks(buffers[LANE_MARKET], latest_ticks)
+            
+        for lane, items in enumerate(buffers):
+            if len(items) > self.max_depths[lane]:
+                self.max_depths[lane] = len(items)
+        
+        # 交易和常规事件总是全部派发
+        self.dispatch(LANE_TRADING, buffers[LANE_TRADING])
+        self.dispatch(LANE_NORMAL, buffers[LANE_NORMAL])
+        
+        # 行情事件受时间预算限制
+        deadline: float = perf_counter() + self.budget
+        self.backlog = self.dispatch(LANE_MARKET, buffers[LANE_MARKET], deadline)
+        self.backlog_size = len(self.backlog)
+        
+        # 还有积压的行情，尽快开始下一轮（新到的交易事件会优先）
+        if self.backlog:
+            QtCore.QTimer.singleShot(0, self.process_batch)
+            
+    def collapse_ticks(
+        self,
+        items: List[Tuple[float, Event]],
+        latest_ticks: Dict[Tuple[str, str], Tuple[float, Event]]
+    ) -> List[Tuple[float, Event]]:
+        """合并排队中的行情，每个合约只保留最新的一个（运行在GUI线程）"""
+        merged: Dict[Tuple[str, str], Tuple[float, Event]] = {}
+        
+        for item in items:
+            event: Event = item[1]
+            merged[(event.type, event.data.vt_symbol)] = item
+            
+        merged.update(latest_ticks)
+        
+        # 被替换的旧行情计入丢弃数量
+        shed: int = len(items) + len(latest_ticks) - len(merged)
+        with self.lock:
+            self.shed_count += shed
+            
+        return list(merged.values())
+        
+    def dispatch(self, lane: int, items: List[Tuple[float, Event]], deadline: float = 0) -> List[Tuple[float, Event]]:
+        """派发一个通道的事件，返回因超时未派发的部分"""
+        if not items:
+            return []
+        
+        handlers: Dict[str, List[Callable[[Event], None]]] = self.handlers
+        now: float = perf_counter()
+        
+        tracer = self.tracer
+        traces: dict = tracer.traces if tracer else None
+        
+        wait_max: float = self.wait_maxes[lane]
+        wait_total: float = 0
+        count: int = 0
+        
+        for enqueue_time, event in items:
+            # 每派发100个事件检查一次时间预算
+            if deadline and count and not count % 100:
+                now = perf_counter()
+                if now > deadline:
+                    break
+            
+            wait: float = now - enqueue_time
+            wait_total += wait
+            if wait > wait_max:
+                wait_max = wait
+            count += 1
+            
+            handler_list: list = handlers.get(event.type, None)
+            if not handler_list:
+                continue
+            
+            # 被抽样追踪的事件
+            if traces and id(event) in traces:
+                tracer.dispatch(traces.pop(id(event)), enqueue_time, handler_list)
+            else:
+                # 单个处理函数出错不能丢弃本帧剩余的事件
+                for handler in handler_list:
+                    try:
+                        handler(event)
+                    except Exception:
+                        report_error(handler, event)
+                
+            self.delivery_count += len(handler_list)
+            
+        self.wait_counts[lane] += count
+        self.wait_totals[lane] += wait_total
+        self.wait_maxes[lane] = wait_max
+        
+        return items[count:]
+            
+    def get_rates(self) -> Dict[str, float]:
+        """计算上次查询以来的每秒统计"""
+        now: float = perf_counter()
+        counts: tuple = (self.event_count, self.signal_count, self.delivery_count)
+        
+        duration: float = now - self.last_time
+        rates: List[float] = [
+            (count - last) / duration
+            for count, last in zip(counts, self.last_counts)
+        ]
+        
+        self.last_time = now
+        self.last_counts = counts
+        
+        # 原方案中每次派发都对应一次跨线程信号
+        return {
+            "event": rates[0],
+            "signal": rates[1],
+            "delivery": rates[2]
+        }
+        
+    def get_lane_stats(self) -> List[Dict[str, float]]:
+        """查询各通道的队列深度和等待时间（毫秒），并开始新的统计窗口"""
+        with self.lock:
+            depths: List[int] = [len(items) for items in self.buffers]
+            depths[LANE_MARKET] += len(self.latest_ticks)
+        depths[LANE_MARKET] += len(self.backlog)
+        
+        stats: List[Dict[str, float]] = []
+        
+        for lane, name in enumerate(LANE_NAMES):
+            count: int = self.wait_counts[lane]
+            if count:
+                mean_wait: float = self.wait_totals[lane] / count * 1000
+            else:
+                mean_wait: float = 0
+                
+            stats.append({
+                "name": name,
+                "depth": depths[lane],
+                "max_depth": self.max_depths[lane],
+                "count": count,
+                "mean_wait": mean_wait,
+                "max_wait": self.wait_maxes[lane] * 1000
+            })
+            
+        self.wait_counts = [0] * len(LANE_NAMES)
+        self.wait_totals = [0.0] * len(LANE_NAMES)
+        self.wait_maxes = [0.0] * len(LANE_NAMES)
+        self.max_depths = [0] * len(LANE_NAMES)
+        
+        return stats
+    
+    def get_backpressure(self) -> Dict[str, int]:
+        """查询行情通道的积压和丢弃情况"""
+        with self.lock:
+            depth: int = len(self.buffers[LANE_MARKET]) + len(self.latest_ticks)
+            shedding: bool = bool(self.latest_ticks)
+            
+        return {
+            "depth": depth + len(self.backlog),
+            "capacity": self.capacity,
+            "shed": self.shed_count,
+            "shedding": shedding
+        }
@@ -0,0 +1,319 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from recorder import TICK_DTYPE, load_columns
+
+
+# 以最小价格变动为单位保存为整数的价格字段
+PRICE_FIELDS: List[str] = [
+    "last_price", "limit_up", "limit_down", "open_price", "high_price", "low_price", "pre_close",
+    "bid_price_1", "bid_price_2", "bid_price_3", "bid_price_4", "bid_price_5",
+    "ask_price_1", "ask_price_2", "ask_price_3", "ask_price_4", "ask_price_5",
+]
+
+# 列编码方式：价格（价位整数差分）、整数（差分）、浮点（原始字节）
+KIND_PRICE: str = "price"
+KIND_INT: str = "int"
+KIND_FLOAT: str = "float"
+
+MAGIC: bytes = b"TKZ1"
+
+# 块索引：块首时间戳、首行序号、行数、文件偏移、字节数
+INDEX_DTYPE: np.dtype = np.dtype([
+    ("timestamp", "<i8"),
+    ("row", "<i8"),
+    ("count", "<i8"),
+    ("offset", "<i8"),
+    ("size", "<i8"),
+])
+
+U7: np.uint64 = np.uint64(7)
+U1: np.uint64 = np.uint64(1)
+MASK: np.uint64 = np.uint64(0x7F)
+
+
+def encode_varint(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """无符号整数的变长编码（每字节7位），返回字节数组和每个值的字节数"""
+    values = values.astype(np.uint64)
+    
+    lengths: np.ndarray = np.ones(len(values), dtype=np.int64)
+    rest: np.ndarray = values >> U7
+    while rest.any():
+        lengths += rest > 0
+        rest >>= U7
+    
+    data: np.ndarray = np.empty(int(lengths.sum()), dtype=np.uint8)
+    starts: np.ndarray = np.cumsum(lengths) - lengths
+    
+    # 按字节位置逐层写入，除最后一个字节外都带延续标志
+    rest = values.copy()
+    for k in range(int(lengths.max()) if len(values) else 0):
+        mask: np.ndarray = lengths > k
+        
+        part: np.ndarray = (rest[mask] & MASK).astype(np.uint8)
+        part[lengths[mask] > k + 1] |= 0x80
+        data[starts[mask] + k] = part
+        
+        rest >>= U7
+    
+    return data, lengths
+
+
+def decode_varint(data: np.ndarray) -> np.ndarray:
+    """变长编码的向量化解码"""
+    if not len(data):
+        return np.empty(0, dtype=np.uint64)
+    
+    ends: np.ndarray = np.flatnonzero(data < 0x80)
+    
+    # 全部是单字节值时直接返回
+    if len(ends) == len(data):
+        return data.astype(np.uint64)
+    
+    starts: np.ndarray = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    lengths: np.ndarray = ends - starts + 1
+    
+    # 按字节位置逐层累加，多字节的值通常很少，后面几层只处理一小部分
+    values: np.ndarray = (data[starts] & 0x7F).astype(np.uint64)
+    index: np.ndarray = np.flatnonzero(lengths > 1)
+    
+    for k in range(1, int(lengths.max())):
+        part: np.ndarray = (data[starts[index] + k] & 0x7F).astype(np.uint64)
+        values[index] |= part << np.uint64(7 * k)
+        index = index[lengths[index] > k + 1]
+    
+    return values
+
+
+def zigzag_encode(values: np.ndarray) -> np.ndarray:
+    """有符号整数映射为无符号整数，绝对值小的数编码短"""
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def zigzag_decode(values: np.ndarray) -> np.ndarray:
+    """zigzag编码的逆变换"""
+    return (values >> U1).view(np.int64) ^ -(values & U1).view(np.int64)
+
+
+def is_on_tick(column: np.ndarray, pricetick: float) -> bool:
+    """检查价格是否都是最小价格变动的整数倍（可以无损还原）"""
+    ticks: np.ndarray = np.round(column / pricetick)
+    return bool(np.allclose(ticks * pricetick, column, rtol=0, atol=pricetick * 1e-6))
+
+
+def get_kinds(columns: Dict[str, np.ndarray], pricetick: float) -> Dict[str, str]:
+    """确定每一列的编码方式"""
+    kinds: Dict[str, str] = {}
+    
+    for name in TICK_DTYPE.names:
+        column: np.ndarray = columns[name]
+        
+        # 价格中有不在价位上的数据时，该列保存原始浮点数
+        if name in PRICE_FIELDS:
+            if is_on_tick(column, pricetick):
+                kinds[name] = KIND_PRICE
+            else:
+                kinds[name] = KIND_FLOAT
+        elif column.dtype.kind == "i" or np.array_equal(column, np.round(column)):
+            kinds[name] = KIND_INT
+        else:
+            kinds[name] = KIND_FLOAT
+    
+    return kinds
+
+
+def to_integers(column: np.ndarray, kind: str, pricetick: float) -> np.ndarray:
+    """整数列取整，价格列转为价位整数"""
+    if kind == KIND_INT:
+        return np.round(column).astype(np.int64)
+    
+    return np.round(column / pricetick).astype(np.int64)
+
+
+def save_ticks(
+    path: str,
+    vt_symbol: str,
+    columns: Dict[str, np.ndarray],
+    pricetick: float,
+    block_size: int = 1024
+) -> int:
+    """将一个合约的行情列数据压缩保存，返回文件字节数"""
+    count: int = len(columns["datetime"])
+    kinds: Dict[str, str] = get_kinds(columns, pricetick)
+    block_starts: np.ndarray = np.arange(0, count, block_size)
+    
+    # 各列整体编码，再按块切分（每块第一个值保存原值，可独立解码）
+    encoded: List[Tuple[np.ndarray, np.ndarray]] = []
+    
+    for name in TICK_DTYPE.names:
+        column: np.ndarray = np.asarray(columns[name])
+        kind: str = kinds[name]
+        
+        if kind == KIND_FLOAT:
+            data: np.ndarray = column.astype("<f8").view(np.uint8)
+            offsets: np.ndarray = block_starts * 8
+        else:
+            values: np.ndarray = to_integers(column, kind, pricetick)
+            
+            deltas: np.ndarray = np.diff(values, prepend=0)
+            deltas[block_starts] = values[block_starts]
+            
+            data, lengths = encode_varint(zigzag_encode(deltas))
+            offsets: np.ndarray = (np.cumsum(lengths) - lengths)[block_starts]
+        
+        encoded.append((data, np.append(offsets, len(data))))
+    
+    # 每块：各列字节数，然后依次是各列数据
+    blocks: List[bytes] = []
+    index: np.ndarray = np.zeros(len(block_starts), dtype=INDEX_DTYPE)
+    
+    for i, row in enumerate(block_starts):
+        sizes: List[int] = []
+        parts: List[bytes] = []
+        
+        for data, offsets in encoded:
+            part: np.ndarray = data[offsets[i]:offsets[i + 1]]
+            sizes.append(len(part))
+            parts.append(part.tobytes())
+        
+        block: bytes = np.array(sizes, dtype="<u4").tobytes() + b"".join(parts)
+        blocks.append(block)
+        
+        index[i]["timestamp"] = columns["datetime"][row]
+        index[i]["row"] = row
+        index[i]["count"] = min(block_size, count - row)
+        index[i]["size"] = len(block)
+    
+    header: bytes = json.dumps({
+        "vt_symbol": vt_symbol,
+        "pricetick": pricetick,
+        "count": count,
+        "block_size": block_size,
+        "fields": [[name, TICK_DTYPE[name].str, kinds[name]] for name in TICK_DTYPE.names]
+    }).encode("utf-8")
+    
+    # 文件头：标识、头长度、头、块索引，然后是各块
+    prefix_size: int = len(MAGIC) + 4 + len(header) + index.nbytes
+    index["offset"] = prefix_size + np.cumsum(index["size"]) - index["size"]
+    
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint32(len(header)).tobytes())
+        f.write(header)
+        f.write(index.tobytes())
+        for block in blocks:
+            f.write(block)
+    
+    return prefix_size + int(index["size"].sum())
+
+
+class TickFile:
+    """压缩行情文件的读取，支持按时间定位到块"""
+    
+    def __init__(self, path: str) -> None:
+        """构造函数"""
+        self.data: np.ndarray = np.memmap(path, dtype=np.uint8, mode="r").view(np.ndarray)
+        
+        if self.data[:4].tobytes() != MAGIC:
+            raise ValueError(f"{path}不是压缩行情文件")
+        
+        header_size: int = int(self.data[4:8].view("<u4")[0])
+        header: dict = json.loads(self.data[8:8 + header_size].tobytes())
+        
+        self.vt_symbol: str = header["vt_symbol"]
+        self.pricetick: float = header["pricetick"]
+        self.count: int = header["count"]
+        self.fields: List[Tuple[str, np.dtype, str]] = [
+            (name, np.dtype(dtype), kind) for name, dtype, kind in header["fields"]
+        ]
+        
+        index_start: int = 8 + header_size
+        block_count: int = -(-self.count // header["block_size"])
+        index_end: int = index_start + block_count * INDEX_DTYPE.itemsize
+        self.index: np.ndarray = self.data[index_start:index_end].view(INDEX_DTYPE)
+    
+    def find_block(self, timestamp: int) -> int:
+        """查找可能包含该时间戳（微秒）的第一个块序号"""
+        # 相同时间戳的行情可能跨越块边界，从首个时间戳不小于它的块的前一块开始
+        return max(int(np.searchsorted(self.index["timestamp"], timestamp, side="left")) - 1, 0)
+    
+    def read(self, start: int = 0, end: int = None) -> Dict[str, np.ndarray]:
+        """解码第start到end-1块（默认全部）"""
+        blocks: np.ndarray = self.index[start:end]
+        column_count: int = len(self.fields)
+        
+        # 收集每一列在各块中的字节
+        parts: List[List[np.ndarray]] = [[] for _ in self.fields]
+        
+        for offset, size in zip(blocks["offset"].tolist(), blocks["size"].tolist()):
+            block: np.ndarray = self.data[offset:offset + size]
+            sizes: np.ndarray = block[:column_count * 4].view("<u4")
+            
+            position: int = column_count * 4
+            for i, column_size in enumerate(sizes.tolist()):
+                parts[i].append(block[position:position + column_size])
+                position += column_size
+        
+        # 整数列拼接后一次解码，每列的值数量都等于行数
+        counts: np.ndarray = blocks["count"]
+        row_count: int = int(counts.sum())
+        
+        int_parts: List[np.ndarray] = []
+        int_count: int = 0
+        
+        for (name, dtype, kind), column_parts in zip(self.fields, parts):
+            if kind != KIND_FLOAT:
+                int_parts.extend(column_parts)
+                int_count += 1
+        
+        if int_parts:
+            deltas: np.ndarray = zigzag_decode(decode_varint(np.concatenate(int_parts)))
+        else:
+            deltas: np.ndarray = np.empty(0, dtype=np.int64)
+        
+        # 各块第一个值是原值，整体累加后减去前面块的累计值
+        sums: np.ndarray = np.cumsum(deltas.reshape(int_count, row_count), axis=1)
+        if row_count:
+            block_ends: np.ndarray = np.cumsum(counts)[:-1] - 1
+            carried: np.ndarray = np.hstack([np.zeros((len(sums), 1), np.int64), sums[:, block_ends]])
+            sums -= np.repeat(carried, counts, axis=1)
+        
+        columns: Dict[str, np.ndarray] = {}
+        int_index: int = 0
+        
+        for (name, dtype, kind), column_parts in zip(self.fields, parts):
+            if kind == KIND_FLOAT:
+                data: np.ndarray = np.concatenate(column_parts) if column_parts else np.empty(0, np.uint8)
+                columns[name] = data.view("<f8").astype(dtype)
+                continue
+            
+            values: np.ndarray = sums[int_index]
+            int_index += 1
+            
+            if kind == KIND_PRICE:
+                columns[name] = np.round(values * self.pricetick, 8).astype(dtype)
+            else:
+                columns[name] = values.astype(dtype)
+        
+        return columns
+    
+    def read_range(self, start_timestamp: int, end_timestamp: int) -> Dict[str, np.ndarray]:
+        """解码时间范围内（微秒，含两端）的行情，只读取涉及的块"""
+        start: int = self.find_block(start_timestamp)
+        end: int = int(np.searchsorted(self.index["timestamp"], end_timestamp, side="right"))
+        columns: Dict[str, np.ndarray] = self.read(start, end)
+        
+        timestamps: np.ndarray = columns["datetime"]
+        mask: np.ndarray = (timestamps >= start_timestamp) & (timestamps <= end_timestamp)
+        return {name: column[mask] for name, column in columns.items()}
+
+
+def compress_recording(folder: str, path: str, pricetick: float, block_size: int = 1024) -> int:
+    """压缩录制器保存的一个合约目录（最小价格变动可从ContractData获取）"""
+    columns: Dict[str, np.ndarray] = load_columns(folder)
+    return save_ticks(path, Path(folder).name, columns, pricetick, block_size)
@@ -0,0 +1,267 @@
+import os
+import pickle
+import zlib
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from queue import Queue, Empty
+from struct import Struct
+from threading import Thread
+from time import perf_counter
+from typing import BinaryIO, Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+from vnpy.event import EventEngine, Event
+from vnpy.trader.event import EVENT_ORDER, EVENT_TRADE, EVENT_POSITION, EVENT_ACCOUNT, EVENT_LOG
+
+
+CHINA_TZ = ZoneInfo("Asia/Shanghai")
+
+# 日盘收盘后、夜盘开始前的换日时间，之后的数据属于下一个交易日
+ROLLOVER_HOUR: int = 20
+
+# 需要记录的事件类型
+JOURNAL_EVENTS: List[str] = [EVENT_ORDER, EVENT_TRADE, EVENT_POSITION, EVENT_ACCOUNT, EVENT_LOG]
+
+# 定期推送的快照类事件只保留每个主键的最新数据
+SNAPSHOT_KEYS: Dict[str, str] = {
+    EVENT_POSITION: "vt_positionid",
+    EVENT_ACCOUNT: "vt_accountid"
+}
+
+# 每条记录的头部：数据长度、CRC32校验、记录类型
+HEADER: Struct = Struct("<IIB")
+
+# 记录类型：单个事件、最新快照（全部持仓和资金）
+RECORD_EVENT: int = 0
+RECORD_SNAPSHOT: int = 1
+
+
+def get_trading_day(dt: datetime = None) -> date:
+    """计算所属的交易日：夜盘属于下一个交易日，周五夜盘和周六凌晨属于下周一"""
+    if not dt:
+        dt = datetime.now(CHINA_TZ)
+    
+    day: date = dt.date()
+    if dt.hour >= ROLLOVER_HOUR:
+        day += timedelta(days=1)
+    
+    # 节假日前没有夜盘，只需要跳过周末
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    
+    return day
+
+
+def get_journal_path(folder: Path, day: date = None) -> Path:
+    """每个交易日一个日志文件"""
+    if not day:
+        day = get_trading_day()
+    return Path(folder).joinpath(f"{day:%Y%m%d}.journal")
+
+
+def load_payload(payload: memoryview) -> object:
+    """还原一条记录，无法还原（比如数据类定义变化）时返回None"""
+    try:
+        return pickle.loads(payload)
+    except Exception:
+        return None
+
+
+def read_journal(path: Path) -> Tuple[List[Tuple[str, object]], int]:
+    """读取日志文件，返回（事件类型和数据的列表，完整记录的字节数）"""
+    if not path.exists():
+        return [], 0
+    
+    data: bytes = path.read_bytes()
+    view: memoryview = memoryview(data)
+    
+    records: List[Tuple[str, object]] = []
+    snapshot: memoryview = None
+    position: int = 0
+    
+    while position + HEADER.size <= len(data):
+        length, crc, kind = HEADER.unpack_from(data, position)
+        start: int = position + HEADER.size
+        end: int = start + length
+        
+        # 崩溃时最后一条记录可能只写了一部分
+        if end > len(data) or zlib.crc32(view[start:end]) != crc:
+            break
+        
+        # 快照只需要还原最后一个
+        if kind == RECORD_SNAPSHOT:
+            snapshot = view[start:end]
+        else:
+            record: tuple = load_payload(view[start:end])
+            if record:
+                records.append(record)
+        
+        position = end
+    
+    if snapshot is not None:
+        records.extend(load_payload(snapshot) or [])
+    
+    return records, position
+
+
+class EventJournal:
+    """只追加的事件日志，写盘和同步在后台线程完成"""
+    
+    def __init__(
+        self,
+        event_engine: EventEngine,
+        path: Path,
+        sync_interval: float = 1,
+        batch_size: int = 1000,
+        snapshot_interval: float = 10
+    ) -> None:
+        """构造函数"""
+        self.event_engine: EventEngine = event_engine
+        self.path: Path = Path(path)
+        
+        # 每批最多写入的记录数，同步到磁盘的最大间隔（秒）
+        self.sync_interval: float = sync_interval
+        self.batch_size: int = batch_size
+        
+        self.queue: Queue = Queue()
+        self.file: BinaryIO = None
+        self.thread: Thread = Thread(target=self.run, daemon=True)
+        
+        self.sync_time: float = 0
+        self.unsynced: bool = False
+        
+        # 持仓和资金的最新数据，变化后每隔snapshot_interval秒写入一次快照
+        self.snapshot_interval: float = snapshot_interval
+        self.snapshot_time: float = 0
+        self.latest: Dict[Tuple[str, str], tuple] = {}
+        self.changed: bool = False
+        
+        self.write_count: int = 0
+        self.sync_count: int = 0
+    
+    def load(self) -> List[Tuple[str, object]]:
+        """读取已有的记录，并截掉末尾不完整的部分（在start之前调用）"""
+        records, size = read_journal(self.path)
+        
+        # 之后的快照要包含重启后没有再更新的持仓和资金
+        for event_type, data in records:
+            key: str = SNAPSHOT_KEYS.get(event_type, "")
+            if key:
+                self.latest[(event_type, getattr(data, key))] = (event_type, data)
+        
+        # 保证之后追加的记录从完整的位置开始
+        if self.path.exists() and self.path.stat().st_size > size:
+            with open(self.path, "r+b") as f:
+                f.truncate(size)
+        
+        return records
+    
+    def start(self) -> None:
+        """开始记录"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, "ab")
+        self.sync_time = perf_counter()
+        self.snapshot_time = perf_counter()
+        self.thread.start()
+        
+        for event_type in JOURNAL_EVENTS:
+            self.event_engine.register(event_type, self.process_event)
+    
+    def stop(self) -> None:
+        """停止记录，写入并同步剩余的数据（在事件引擎停止后调用）"""
+        for event_type in JOURNAL_EVENTS:
+            self.event_engine.unregister(event_type, self.process_event)
+        
+        self.queue.put(None)
+        self.thread.join()
+    
+    def process_event(self, event: Event) -> None:
+        """提交给写盘线程（运行在事件引擎线程，不做序列化和磁盘操作）"""
+        self.queue.put((event.type, event.data))
+    
+    def run(self) -> None:
+        """写盘线程：取出当前积压的全部记录一次写入"""
+        active: bool = True
+        
+        while active:
+            try:
+                item: tuple = self.queue.get(timeout=self.sync_interval)
+            except Empty:
+                self.write([])
+                continue
+            
+            batch: List[tuple] = []
+            
+            while True:
+                if item is None:
+                    active = False
+                    break
+                
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                
+                try:
+                    item = self.queue.get_nowait()
+                except Empty:
+                    break
+            
+            self.write(batch)
+        
+        self.write_snapshot()
+        self.sync()
+        self.file.close()
+    
+    def write(self, batch: List[tuple]) -> None:
+        """序列化并追加一批记录，持仓和资金只更新最新数据"""
+        parts: List[bytes] = []
+        
+        for item in batch:
+            event_type, data = item
+            
+            key: str = SNAPSHOT_KEYS.get(event_type, "")
+            if key:
+                self.latest[(event_type, getattr(data, key))] = item
+                self.changed = True
+            else:
+                parts.append(self.pack(RECORD_EVENT, item))
+        
+        if parts:
+            self.append(parts)
+        
+        if self.changed and perf_counter() - self.snapshot_time >= self.snapshot_interval:
+            self.write_snapshot()
+        
+        # 定期同步到磁盘，防止断电丢失
+        if perf_counter() - self.sync_time >= self.sync_interval:
+            self.sync()
+    
+    def write_snapshot(self) -> None:
+        """追加一条包含全部持仓和资金最新数据的快照"""
+        if self.changed:
+            self.append([self.pack(RECORD_SNAPSHOT, list(self.latest.values()))])
+            self.changed = False
+        
+        self.snapshot_time = perf_counter()
+    
+    def pack(self, kind: int, item: object) -> bytes:
+        """序列化一条记录"""
+        payload: bytes = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        return HEADER.pack(len(payload), zlib.crc32(payload), kind) + payload
+    
+    def append(self, parts: List[bytes]) -> None:
+        """写入记录并刷新到操作系统，程序崩溃时不会丢失"""
+        self.file.write(b"".join(parts))
+        self.file.flush()
+        
+        self.write_count += len(parts)
+        self.unsynced = True
+    
+    def sync(self) -> None:
+        """同步到磁盘"""
+        if self.unsynced:
+            os.fsync(self.file.fileno())
+            self.sync_count += 1
+        
+        self.sync_time = perf_counter()
+        self.unsynced = False
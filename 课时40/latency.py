@@ -0,0 +1,422 @@
+import csv
+from collections import deque
+from math import ceil
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Deque, Dict, List, Sequence, Tuple
+
+from PySide6 import QtCore, QtWidgets
+
+from vnpy.event import EventEngine, Event
+from vnpy.trader.event import EVENT_TICK, EVENT_ORDER, EVENT_TRADE
+from vnpy.trader.object import OrderData, TradeData
+
+from bridge import report_error
+
+
+# 延时统计阶段，均从点击下单开始计时
+STAGE_NAMES: List[str] = ["发单返回", "委托回报", "首笔成交"]
+
+# 行情追踪阶段：引擎队列、桥接等待、控件处理、接口回调到绘制
+TRACE_STAGES: List[str] = ["入队", "派发", "处理", "上屏"]
+
+
+class LatencyRecord:
+    """单笔委托各阶段的时间戳（秒，单调时钟）"""
+    
+    __slots__ = ("vt_orderid", "click_time", "send_time", "order_time", "trade_time")
+    
+    def __init__(self, vt_orderid: str) -> None:
+        """构造函数"""
+        self.vt_orderid: str = vt_orderid
+        self.click_time: float = 0
+        self.send_time: float = 0
+        self.order_time: float = 0
+        self.trade_time: float = 0
+    
+    def get_latencies(self) -> List[float]:
+        """各阶段相对点击的延时（毫秒），未到达的阶段为0"""
+        latencies: List[float] = []
+        for t in (self.send_time, self.order_time, self.trade_time):
+            if t and self.click_time:
+                latencies.append((t - self.click_time) * 1000)
+            else:
+                latencies.append(0)
+        return latencies
+
+
+def get_percentile(values: List[float], percent: float) -> float:
+    """计算已排序数据的分位数（最近秩）"""
+    if not values:
+        return 0
+    
+    # 第ceil(n*p/100)小的值，p50在偶数个数据时取较小的中间值
+    ix: int = max(0, ceil(len(values) * percent / 100) - 1)
+    return values[ix]
+
+
+class OrderLatencyTracker:
+    """点击到交易所的委托延时统计"""
+    
+    def __init__(self, capacity: int = 10000, early_timeout: float = 1) -> None:
+        """构造函数"""
+        # 本界面下单的委托号到时间戳记录，超出容量后丢弃最早的记录
+        self.capacity: int = capacity
+        self.records: Dict[str, LatencyRecord] = {}
+        
+        # 还没有点击记录的回报（到达时间，记录），超时（秒）后丢弃，
+        # 登录查询和其他来源的委托不会挤掉点击记录
+        self.early_timeout: float = early_timeout
+        self.early: Dict[str, Tuple[float, LatencyRecord]] = {}
+        
+        # 各阶段的延时样本（毫秒）
+        self.samples: List[Deque[float]] = [deque(maxlen=capacity) for _ in STAGE_NAMES]
+        
+        # 回报在事件引擎线程写入，点击在GUI线程写入
+        self.lock: Lock = Lock()
+    
+    def register_event(self, event_engine: EventEngine) -> None:
+        """在事件引擎线程直接记录回报到达时间，不受GUI刷新影响"""
+        event_engine.register(EVENT_ORDER, self.process_order_event)
+        event_engine.register(EVENT_TRADE, self.process_trade_event)
+    
+    def unregister_event(self, event_engine: EventEngine) -> None:
+        """注销事件监听"""
+        event_engine.unregister(EVENT_ORDER, self.process_order_event)
+        event_engine.unregister(EVENT_TRADE, self.process_trade_event)
+    
+    def get_record(self, vt_orderid: str, now: float) -> LatencyRecord:
+        """获取点击记录，没有时获取或创建先到达的回报记录（调用时需持有锁）"""
+        record: LatencyRecord = self.records.get(vt_orderid, None)
+        if record:
+            return record
+        
+        item: Tuple[float, LatencyRecord] = self.early.get(vt_orderid, None)
+        if item:
+            return item[1]
+        
+        # 按到达顺序排列，从头丢弃超时的记录
+        early: Dict[str, Tuple[float, LatencyRecord]] = self.early
+        while early:
+            first_time, first_record = next(iter(early.values()))
+            if now - first_time < self.early_timeout:
+                break
+            del early[first_record.vt_orderid]
+        
+        record = LatencyRecord(vt_orderid)
+        early[vt_orderid] = (now, record)
+        return record
+    
+    def add_order(self, vt_orderid: str, click_time: float) -> None:
+        """send_order返回后记录点击和返回时间"""
+        send_time: float = perf_counter()
+        if not vt_orderid:
+            return
+        
+        with self.lock:
+            # 委托回报可能在send_order返回前就已到达
+            item: Tuple[float, LatencyRecord] = self.early.pop(vt_orderid, None)
+            if item:
+                record: LatencyRecord = item[1]
+            else:
+                record: LatencyRecord = LatencyRecord(vt_orderid)
+            
+            self.records[vt_orderid] = record
+            if len(self.records) > self.capacity:
+                del self.records[next(iter(self.records))]
+            
+            record.click_time = click_time
+            record.send_time = send_time
+            
+            self.samples[0].append((send_time - click_time) * 1000)
+            
+            if record.order_time:
+                self.samples[1].append((record.order_time - click_time) * 1000)
+            if record.trade_time:
+                self.samples[2].append((record.trade_time - click_time) * 1000)
+    
+    def process_order_event(self, event: Event) -> None:
+        """记录首个委托回报的到达时间"""
+        now: float = perf_counter()
+        order: OrderData = event.data
+        
+        with self.lock:
+            record: LatencyRecord = self.get_record(order.vt_orderid, now)
+            if record.order_time:
+                return
+            record.order_time = now
+            
+            if record.click_time:
+                self.samples[1].append((now - record.click_time) * 1000)
+    
+    def process_trade_event(self, event: Event) -> None:
+        """记录首笔成交的到达时间"""
+        now: float = perf_counter()
+        trade: TradeData = event.data
+        
+        with self.lock:
+            record: LatencyRecord = self.get_record(trade.vt_orderid, now)
+            if record.trade_time:
+                return
+            record.trade_time = now
+            
+            if record.click_time:
+                self.samples[2].append((now - record.click_time) * 1000)
+    
+    def get_stats(self) -> List[dict]:
+        """各阶段的样本数和p50/p99/max延时（毫秒）"""
+        with self.lock:
+            samples: List[List[float]] = [sorted(s) for s in self.samples]
+        
+        stats: List[dict] = []
+        for name, values in zip(STAGE_NAMES, samples):
+            stats.append({
+                "name": name,
+                "count": len(values),
+                "p50": get_percentile(values, 50),
+                "p99": get_percentile(values, 99),
+                "max": values[-1] if values else 0
+            })
+        return stats
+    
+    def save_csv(self, path: str) -> int:
+        """导出每笔委托的各阶段延时，返回导出的行数"""
+        with self.lock:
+            records: List[LatencyRecord] = list(self.records.values())
+        
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(["委托号"] + [f"{name}(ms)" for name in STAGE_NAMES])
+            
+            for record in records:
+                latencies: List[float] = record.get_latencies()
+                writer.writerow([record.vt_orderid] + [f"{v:.3f}" for v in latencies])
+        
+        return len(records)
+    
+    def clear(self) -> None:
+        """清空统计"""
+        with self.lock:
+            self.records.clear()
+            self.early.clear()
+            for s in self.samples:
+                s.clear()
+
+
+
+def get_base_type(type: str) -> str:
+    """去掉按代码细分的事件类型后缀"""
+    ix: int = type.find(".")
+    if ix < 0:
+        return type
+    return type[:ix + 1]
+
+
+class TickTrace:
+    """一个被抽样事件的追踪记录"""
+    
+    __slots__ = ("event", "put_time")
+    
+    def __init__(self, event: Event, put_time: float) -> None:
+        """构造函数"""
+        self.event: Event = event
+        self.put_time: float = put_time
+
+
+class TickTracer(QtCore.QObject):
+    """行情从接口回调到界面绘制的抽样延时追踪"""
+    
+    def __init__(
+        self,
+        event_engine: EventEngine,
+        bridge,
+        sample_rate: int = 0,
+        window: int = 1000,
+        types: Sequence[str] = (EVENT_TICK,)
+    ) -> None:
+        """构造函数"""
+        super().__init__()
+        
+        self.event_engine: EventEngine = event_engine
+        self.bridge = bridge
+        
+        # 追踪的事件类型前缀，每种事件类型每sample_rate个抽样1个
+        # （同一行情会以通用和按代码细分的两种类型推送，分开计数避免抽样偏向一种）
+        self.types: Tuple[str, ...] = tuple(types)
+        self.sample_rate: int = 0
+        self.counts: Dict[str, int] = {}
+        
+        # 尚未派发的抽样事件，以事件对象id为键
+        self.capacity: int = 1000
+        self.traces: Dict[int, TickTrace] = {}
+        
+        # 控件到等待绘制的（回调时间，统计样本），超时后放弃
+        self.timeout: float = 1
+        self.pending: Dict[QtWidgets.QWidget, List[tuple]] = {}
+        
+        # 安装了事件过滤器的对象（控件或其视口）到所属控件
+        self.targets: Dict[QtCore.QObject, QtWidgets.QWidget] = {}
+        
+        # （事件类型，控件）到各阶段延时样本（毫秒）
+        self.window: int = window
+        self.samples: Dict[Tuple[str, str], List[Deque[float]]] = {}
+        
+        self.engine_put: Callable[[Event], None] = event_engine.put
+        self.set_sample_rate(sample_rate)
+        
+    def set_sample_rate(self, sample_rate: int) -> None:
+        """设置抽样间隔，0表示关闭追踪"""
+        if sample_rate and not self.sample_rate:
+            # 接口通过event_engine.put推送事件，在这里记录回调时间
+            self.event_engine.put = self.put
+            self.bridge.tracer = self
+        elif not sample_rate and self.sample_rate:
+            self.event_engine.put = self.engine_put
+            self.bridge.tracer = None
+            self.traces.clear()
+            
+            for widget in list(self.pending):
+                self.unwatch(widget)
+            self.pending.clear()
+            
+        self.sample_rate = sample_rate
+        
+    def put(self, event: Event) -> None:
+        """接收接口推送的事件并抽样（运行在接口回调线程）"""
+        sample_rate: int = self.sample_rate
+        
+        if sample_rate and event.type.startswith(self.types):
+            count: int = self.counts.get(event.type, 0) + 1
+            self.counts[event.type] = count
+            
+            if not count % sample_rate and len(self.traces) < self.capacity:
+                self.traces[id(event)] = TickTrace(event, perf_counter())
+                
+        self.engine_put(event)
+        
+    def dispatch(
+        self,
+        trace: TickTrace,
+        enqueue_time: float,
+        handler_list: List[Callable[[Event], None]]
+    ) -> None:
+        """逐个计时调用处理函数（运行在GUI线程）"""
+        event: Event = trace.event
+        type: str = get_base_type(event.type)
+        
+        start: float = perf_counter()
+        queue_latency: float = (enqueue_time - trace.put_time) * 1000
+        bridge_latency: float = (start - enqueue_time) * 1000
+        
+        for handler in handler_list:
+            try:
+                handler(event)
+            except Exception:
+                report_error(handler, event)
+            end: float = perf_counter()
+            
+            # 按处理函数所属的控件统计（性能分析包装过的取原函数）
+            handler = getattr(handler, "__wrapped__", handler)
+            widget = getattr(handler, "__self__", None)
+            if widget is not None:
+                name: str = widget.__class__.__name__
+            else:
+                name: str = handler.__name__
+                
+            samples: List[Deque[float]] = self.get_samples(type, name)
+            samples[0].append(queue_latency)
+            samples[1].append(bridge_latency)
+            samples[2].append((end - start) * 1000)
+            start = end
+            
+            # 可见的控件等待下一次绘制
+            if isinstance(widget, QtWidgets.QWidget) and widget.isVisible():
+                items: List[tuple] = self.pending.get(widget, None)
+                if items is None:
+                    items = self.pending[widget] = []
+                    self.watch(widget)
+                items.append((trace.put_time, samples))
+                
+    def watch(self, widget: QtWidgets.QWidget) -> None:
+        """只在控件及其表格视口上安装事件过滤器，等待绘制"""
+        targets: List[QtWidgets.QWidget] = [widget]
+        
+        # 表格的内容绘制在视口上，容器控件（比如分页）则由子表格绘制
+        if isinstance(widget, QtWidgets.QAbstractScrollArea):
+            targets.append(widget.viewport())
+            
+        for area in widget.findChildren(QtWidgets.QAbstractScrollArea):
+            targets.append(area.viewport())
+            
+        for target in targets:
+            target.installEventFilter(self)
+            self.targets[target] = widget
+            
+    def unwatch(self, widget: QtWidgets.QWidget) -> None:
+        """移除控件上的事件过滤器"""
+        for target, owner in list(self.targets.items()):
+            if owner is widget:
+                target.removeEventFilter(self)
+                self.targets.pop(target)
+                
+    def get_samples(self, type: str, name: str) -> List[Deque[float]]:
+        """获取统计样本"""
+        key: Tuple[str, str] = (type, name)
+        samples: List[Deque[float]] = self.samples.get(key, None)
+        
+        if not samples:
+            samples = [deque(maxlen=self.window) for _ in TRACE_STAGES]
+            self.samples[key] = samples
+        return samples
+        
+    def eventFilter(self, obj: QtCore.QObject, event: QtCore.QEvent) -> bool:
+        """控件（或其表格视口）开始绘制时记录上屏延时"""
+        if event.type() != QtCore.QEvent.Paint:
+            return False
+        
+        widget: QtWidgets.QWidget = self.targets.get(obj, None)
+        if widget is None:
+            return False
+        
+        now: float = perf_counter()
+        for put_time, samples in self.pending.pop(widget, []):
+            samples[3].append((now - put_time) * 1000)
+            
+        # 本次绘制后不再需要过滤
+        self.unwatch(widget)
+        return False
+        
+    def get_stats(self) -> List[dict]:
+        """各事件类型和控件的延时p50/p99（毫秒）"""
+        # 清理没有GUI处理函数的抽样事件
+        now: float = perf_counter()
+        for key, trace in list(self.traces.items()):
+            if now - trace.put_time > self.timeout:
+                self.traces.pop(key, None)
+                
+        # 放弃超时仍未绘制的控件（比如已被隐藏）
+        for widget, items in list(self.pending.items()):
+            if now - items[0][0] > self.timeout:
+                self.pending.pop(widget)
+                self.unwatch(widget)
+                
+        all_stats: List[dict] = []
+        
+        for (type, name), samples in self.samples.items():
+            stats: dict = {
+                "type": type,
+                "widget": name,
+                "count": len(samples[2])
+            }
+            
+            for stage, stage_samples in zip(TRACE_STAGES, samples):
+                values: List[float] = sorted(stage_samples)
+                stats[stage] = (get_percentile(values, 50), get_percentile(values, 99))
+                
+            all_stats.append(stats)
+            
+        return all_stats
+        
+    def clear(self) -> None:
+        """清空统计"""
+        self.samples.clear()
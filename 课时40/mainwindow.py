@@ -1,3 +1,6 @@
+from collections import defaultdict
+from typing import Dict, List
+
 from PySide6 import QtWidgets, QtCore, QtGui
 
 from vnpy.event import EventEngine, Event
@@ -5,6 +8,7 @@ from vnpy.trader.engine import MainEngine
 from vnpy.trader.constant import Exchange
 from vnpy.trader.event import EVENT_LOG
 from vnpy.trader.object import ContractData, SubscribeRequest
+from vnpy.trader.utility import get_folder_path
 
 from monitor import (
     TickMonitor,
@@ -13,26 +17,69 @@ from monitor import (
     TradeMonitor,
     PositionMonitor,
     AccountMonitor,
-    LogMonitor
+    LogMonitor,
+    BaseMonitor
+)
+from widget import (
+    TradingWidget,
+    FlashWidget,
+    LoginDialog,
+    LatencyWidget,
+    TraceWidget,
+    ProfilerWidget
 )
-from widget import TradingWidget, FlashWidget, LoginDialog
+from bridge import EventBridge
+from latency import OrderLatencyTracker, TickTracer
+from profiler import HandlerProfiler
+from journal import EventJournal, get_journal_path
+
+# 监控控件批量刷新间隔（毫秒）
+batch_interval: int = 50
+
+# 是否统计各事件处理函数的耗时（需要在控件注册事件前决定）
+profile_handlers: bool = False
 
 
 class MainWindow(QtWidgets.QMainWindow):
     """主体组件"""
     
-    signal_log = QtCore.Signal(Event)
-    
-    def __init__(self, main_engine: MainEngine, event_engine: EventEngine) -> None:
-        """构造函数"""
+    def __init__(
+        self,
+        main_engine: MainEngine,
+        event_engine: EventEngine,
+        journal_enabled: bool = True
+    ) -> None:
+        """构造函数（journal_enabled：是否记录委托、成交、持仓、资金和日志事件，启动时从记录恢复监控表格）"""
         super().__init__()
 
         self.main_engine = main_engine
         self.event_engine = event_engine
+        
+        # 所有控件共用的事件桥接
+        if profile_handlers:
+            self.profiler = HandlerProfiler()
+        else:
+            self.profiler = None
+        
+        self.bridge = EventBridge(event_engine, profiler=self.profiler)
+        
+        # 点击到交易所的委托延时统计
+        self.tracker = OrderLatencyTracker()
+        
+        # 行情到界面的抽样延时追踪（默认关闭，在行情延时窗口中设置抽样间隔开启）
+        self.tracer = TickTracer(event_engine, self.bridge)
 
         self.init_ui()
         self.register_event()
         
+        # 在连接接口之前恢复上次运行记录的数据（同一时间只应有一个实盘窗口使用）
+        if journal_enabled:
+            self.journal = EventJournal(event_engine, get_journal_path(get_folder_path("journal")))
+            self.load_journal()
+            self.journal.start()
+        else:
+            self.journal = None
+        
     def init_ui(self) -> None:
         """初始化界面"""
         # 设置窗口标题
@@ -48,6 +95,15 @@ class MainWindow(QtWidgets.QMainWindow):
         # 底部状态栏
         self.statusBar().showMessage("程序启动")
         
+        self.backpressure_label = QtWidgets.QLabel()
+        self.statusBar().addPermanentWidget(self.backpressure_label)
+        
+        self.lane_label = QtWidgets.QLabel()
+        self.statusBar().addPermanentWidget(self.lane_label)
+        
+        self.bridge_label = QtWidgets.QLabel()
+        self.statusBar().addPermanentWidget(self.bridge_label)
+        
         # 创建控件     
         self.edit = QtWidgets.QTextEdit()
         self.line = QtWidgets.QLineEdit()
@@ -56,7 +112,7 @@ class MainWindow(QtWidgets.QMainWindow):
         # stylesheet = "color:blue;background-color:orange"
         # self.button.setStyleSheet(stylesheet)
         
-        self.tick_monitor = TickMonitor(self.event_engine)
+        self.tick_monitor = TickMonitor(self.bridge, batch_interval)
         
         # 标签控件
         label = QtWidgets.QLabel()
@@ -79,18 +135,19 @@ class MainWindow(QtWidgets.QMainWindow):
         self.button.clicked.connect(self.subscribe)
         
         # 交易控件
-        self.trading_widget = TradingWidget(self.main_engine)
+        self.trading_widget = TradingWidget(self.main_engine, self.tracker)
         
         # 闪电下单控件
-        self.flash_widget = FlashWidget(self.main_engine, self.event_engine)
+        self.flash_widget = FlashWidget(self.main_engine, self.bridge, self.tracker)
         
         # 监控表格
-        self.order_monitor = OrderMonitor(self.event_engine)
-        self.trade_monitor = TradeMonitor(self.event_engine)
-        self.position_monitor = PositionMonitor(self.event_engine)
-        self.account_monitor = AccountMonitor(self.event_engine)
-        self.market_monitor = MarketMonitor(self.event_engine)
-        self.log_monitor = LogMonitor(self.event_engine)
+        # 委托和成交需要尽快显示，不做批量刷新
+        self.order_monitor = OrderMonitor(self.bridge)
+        self.trade_monitor = TradeMonitor(self.bridge)
+        self.position_monitor = PositionMonitor(self.bridge, batch_interval)
+        self.account_monitor = AccountMonitor(self.bridge, batch_interval)
+        self.market_monitor = MarketMonitor(self.bridge, batch_interval)
+        self.log_monitor = LogMonitor(self.bridge, batch_interval)
         
         # 网格布局
         grid = QtWidgets.QGridLayout()
@@ -138,10 +195,60 @@ class MainWindow(QtWidgets.QMainWindow):
         widget.setLayout(hbox)
         self.setCentralWidget(widget)
         
+        # 延时统计停靠窗口
+        self.latency_widget = LatencyWidget(self.tracker)
+        self.trace_widget = TraceWidget(self.tracer)
+        
+        view_menu = self.menuBar().addMenu("视图")
+        
+        docks: list = [
+            ("委托延时", self.latency_widget),
+            ("行情延时", self.trace_widget)
+        ]
+        
+        if self.profiler:
+            self.profiler_widget = ProfilerWidget(self.profiler)
+            docks.append(("处理耗时", self.profiler_widget))
+        
+        for name, widget in docks:
+            dock = QtWidgets.QDockWidget(name)
+            dock.setObjectName(name)
+            dock.setWidget(widget)
+            self.addDockWidget(QtCore.Qt.BottomDockWidgetArea, dock)
+            view_menu.addAction(dock.toggleViewAction())
+        
     def register_event(self) -> None:
         """注册事件监听"""
-        self.signal_log.connect(self.process_log_event)
-        self.event_engine.register(EVENT_LOG, self.signal_log.emit)
+        self.bridge.register(EVENT_LOG, self.process_log_event)
+        
+        self.tracker.register_event(self.event_engine)
+        
+        # 每秒刷新一次桥接统计
+        self.stats_timer = QtCore.QTimer(self)
+        self.stats_timer.timeout.connect(self.update_bridge_stats)
+        self.stats_timer.start(1000)
+        
+    def load_journal(self) -> None:
+        """从事件日志恢复各监控控件"""
+        monitors: List[BaseMonitor] = [
+            self.order_monitor,
+            self.trade_monitor,
+            self.position_monitor,
+            self.account_monitor,
+            self.log_monitor
+        ]
+        
+        # 按事件类型分组，每个控件一次性载入
+        datas: Dict[str, list] = defaultdict(list)
+        for event_type, data in self.journal.load():
+            datas[event_type].append(data)
+            
+        for monitor in monitors:
+            monitor.load_data(datas[monitor.event_type])
+            
+        count: int = sum(len(d) for d in datas.values())
+        if count:
+            self.statusBar().showMessage(f"从事件日志恢复{count}条记录")
         
     def subscribe(self) -> None:
         """订阅合约行情"""
@@ -160,6 +267,37 @@ class MainWindow(QtWidgets.QMainWindow):
         req = SubscribeRequest(contract.symbol, contract.exchange)
         self.main_engine.subscribe(req, contract.gateway_name)
         
+    def update_bridge_stats(self) -> None:
+        """显示事件桥接统计"""
+        rates: dict = self.bridge.get_rates()
+        
+        # 原方案中每次派发都是一次跨线程信号
+        self.bridge_label.setText(
+            f"事件 {rates['event']:.0f}/s  "
+            f"跨线程信号 {rates['signal']:.0f}/s（原方案 {rates['delivery']:.0f}/s）"
+        )
+        
+        # 各优先级通道的队列深度和最大等待时间
+        texts: list = []
+        for stats in self.bridge.get_lane_stats():
+            texts.append(
+                f"{stats['name']} 队列{stats['max_depth']} "
+                f"等待{stats['mean_wait']:.1f}/{stats['max_wait']:.1f}ms"
+            )
+        self.lane_label.setText("  ".join(texts))
+        
+        # 行情积压和丢弃数量，正在丢弃时标红
+        backpressure: dict = self.bridge.get_backpressure()
+        self.backpressure_label.setText(
+            f"行情积压 {backpressure['depth']}/{backpressure['capacity']}  "
+            f"丢弃 {backpressure['shed']}"
+        )
+        
+        if backpressure["shedding"]:
+            self.backpressure_label.setStyleSheet("color:red")
+        else:
+            self.backpressure_label.setStyleSheet("")
+        
     def show_login_dialog(self) -> None:
         """显示连接登录控件"""
         login_dialog = LoginDialog(self.main_engine)
@@ -208,5 +346,9 @@ class MainWindow(QtWidgets.QMainWindow):
         # 关闭main_engine
         self.main_engine.close()
         
+        # 事件引擎已停止，写入剩余的事件日志
+        if self.journal:
+            self.journal.stop()
+        
         # 接受关闭事件
         event.accept()
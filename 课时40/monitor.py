@@ -1,91 +1,425 @@
 from PySide6 import QtWidgets, QtCore, QtGui
-from typing import Dict
+from typing import Dict, List, Tuple, Callable
 from datetime import datetime
 from enum import Enum
+from array import array
+from operator import attrgetter
+from time import perf_counter
 
-from vnpy.event import EventEngine, Event
+from vnpy.event import Event
 from vnpy.trader.event import EVENT_TICK, EVENT_LOG, EVENT_ORDER, EVENT_TRADE, EVENT_ACCOUNT, EVENT_POSITION
 from vnpy.trader.object import TickData
 
+from bridge import EventBridge
 
-class TickCell(QtWidgets.QTableWidgetItem):
-    """Tick盘口监控表格单元"""
+
+# 单元格样式角色
+STYLE_ROLE: int = QtCore.Qt.UserRole + 1
+
+ROLE_NEUTRAL: str = "neutral"
+ROLE_LONG: str = "long"
+ROLE_SHORT: str = "short"
+
+
+class CellStyle:
+    """单元格显示样式（创建后不再修改）"""
+    
+    __slots__ = ("font", "foreground", "background")
+    
+    def __init__(self, font: QtGui.QFont, foreground: QtGui.QColor, background: QtGui.QBrush) -> None:
+        """构造函数"""
+        self.font: QtGui.QFont = font
+        self.foreground: QtGui.QColor = foreground
+        self.background: QtGui.QBrush = background
+        
+
+class StyleRegistry:
+    """共享样式注册表"""
+    
+    styles: Dict[Tuple[int, str], Dict[str, CellStyle]] = {}
+    
+    @classmethod
+    def get_styles(cls, font_size: int, background: str = "") -> Dict[str, CellStyle]:
+        """获取某种表格的全部角色样式，首次调用时创建"""
+        key: Tuple[int, str] = (font_size, background)
+        styles: Dict[str, CellStyle] = cls.styles.get(key, None)
+        if styles:
+            return styles
+        
+        # 字体和背景由所有角色共享
+        font = QtGui.QFont("微软雅黑", font_size)
+        
+        if background:
+            brush = QtGui.QBrush(QtGui.QColor(background))
+        else:
+            brush = None
+            
+        # 多空角色只替换文字颜色，中性角色沿用表格配色
+        styles = {
+            ROLE_NEUTRAL: CellStyle(font, None, brush),
+            ROLE_LONG: CellStyle(font, QtGui.QColor("red"), brush),
+            ROLE_SHORT: CellStyle(font, QtGui.QColor("green"), brush)
+        }
+            
+        cls.styles[key] = styles
+        return styles
+        
+        
+class MonitorDelegate(QtWidgets.QStyledItemDelegate):
+    """监控表格绘制代理，使用共享样式绘制单元格"""
+    
+    def __init__(self, styles: Dict[str, CellStyle], parent: QtCore.QObject = None) -> None:
+        """构造函数"""
+        super().__init__(parent)
+        
+        self.styles: Dict[str, CellStyle] = styles
+        self.neutral: CellStyle = styles[ROLE_NEUTRAL]
+        
+        # 基于表格调色板生成的角色调色板
+        self.palettes: Dict[str, QtGui.QPalette] = {}
+        
+    def initStyleOption(self, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex) -> None:
+        """设置单元格绘制参数"""
+        super().initStyleOption(option, index)
+        
+        role: str = index.data(STYLE_ROLE)
+        if role:
+            style: CellStyle = self.styles[role]
+        else:
+            style: CellStyle = self.neutral
+        
+        option.font = style.font
+        option.displayAlignment = QtCore.Qt.AlignCenter
+        
+        if style.background:
+            option.backgroundBrush = style.background
+            
+        if style.foreground:
+            option.palette = self.get_palette(role, style, option.palette)
+            
+    def get_palette(self, role: str, style: CellStyle, base: QtGui.QPalette) -> QtGui.QPalette:
+        """获取角色调色板，首次使用时创建"""
+        palette: QtGui.QPalette = self.palettes.get(role, None)
+        
+        if not palette:
+            palette = QtGui.QPalette(base)
+            palette.setColor(QtGui.QPalette.Text, style.foreground)
+            self.palettes[role] = palette
+            
+        return palette
+
+
+# 成交明细信息文本，编码为 方向序号 * 3 + 开平序号
+INFO_TEXTS: List[str] = [d + o for d in ("多", "空", "双") for o in ("开", "平", "换")]
+
+
+class TickArchive:
+    """Tick成交明细紧凑归档"""
+    
+    def __init__(self) -> None:
+        """构造函数"""
+        self.prices: array = array("d")
+        self.codes: array = array("B")
+        
+    def __len__(self) -> int:
+        """归档数量"""
+        return len(self.prices)
+        
+    def append(self, price: float, code: int) -> None:
+        """归档一条成交明细"""
+        self.prices.append(price)
+        self.codes.append(code)
+        
+    def get_prints(self, start: int = 0, end: int = None) -> List[Tuple[float, str]]:
+        """读取归档的成交明细"""
+        prices = self.prices[start:end]
+        codes = self.codes[start:end]
+        return [(price, INFO_TEXTS[code]) for price, code in zip(prices, codes)]
+
+
+class TickModel(QtCore.QAbstractTableModel):
+    """Tick成交明细数据模型（固定容量环形缓冲）"""
     
-    def __init__(self, text: str = "") -> None:
+    labels: List[str] = ["代码", "最新价", "信息"]
+    
+    def __init__(self, vt_symbol: str, capacity: int, parent: QtCore.QObject = None) -> None:
         """构造函数"""
-        super().__init__(text)
+        super().__init__(parent)
+        
+        self.vt_symbol: str = vt_symbol
+        self.capacity: int = capacity
+        
+        # 环形缓冲区，head指向最旧的一条
+        self.prices: List[float] = [0.0] * capacity
+        self.codes: List[int] = [0] * capacity
+        self.head: int = 0
+        self.count: int = 0
+        
+        # 移出缓冲区的历史明细
+        self.archive: TickArchive = TickArchive()
+        
+        # 表格不可见时不发出刷新通知，只标记为过期
+        self.active: bool = False
+        self.stale: bool = False
+        
+        # 已通知视图的行数
+        self.row_count: int = 0
         
-        font = QtGui.QFont("微软雅黑", 14)
-        self.setFont(font)
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        """行数"""
+        if parent.isValid():
+            return 0
+        return self.row_count
+    
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        """列数"""
+        if parent.isValid():
+            return 0
+        return len(self.labels)
+    
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole) -> object:
+        """按需生成单元格显示数据"""
+        column: int = index.column()
+        
+        if role == QtCore.Qt.DisplayRole:
+            if column == 0:
+                return self.vt_symbol
+            
+            n: int = (self.head + index.row()) % self.capacity
+            if column == 1:
+                return str(self.prices[n])
+            else:
+                return INFO_TEXTS[self.codes[n]]
+        elif role == STYLE_ROLE:
+            if column != 2:
+                return None
+            
+            n: int = (self.head + index.row()) % self.capacity
+            code: int = self.codes[n]
+            if code < 3:
+                return ROLE_LONG
+            elif code < 6:
+                return ROLE_SHORT
+        
+        return None
+    
+    def headerData(self, section: int, orientation: QtCore.Qt.Orientation, role: int = QtCore.Qt.DisplayRole) -> object:
+        """表头数据"""
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.labels[section]
         
-        self.setTextAlignment(QtCore.Qt.AlignCenter)
+        return None
+    
+    def set_active(self, active: bool) -> None:
+        """设置表格是否可见，变为可见时一次性刷新"""
+        if active and self.stale:
+            self.beginResetModel()
+            self.row_count = self.count
+            self.stale = False
+            self.endResetModel()
+            
+        self.active = active
+    
+    def append_print(self, price: float, code: int) -> None:
+        """在尾部添加一条成交明细"""
+        # 表格不可见，只写入缓冲区
+        if not self.active:
+            self.stale = True
+            
+            if self.count < self.capacity:
+                self.prices[self.count] = price
+                self.codes[self.count] = code
+                self.count += 1
+            else:
+                self.archive.append(self.prices[self.head], self.codes[self.head])
+                
+                self.prices[self.head] = price
+                self.codes[self.head] = code
+                self.head = (self.head + 1) % self.capacity
+            return
         
-        self.setBackground(QtGui.QColor("yellow"))
+        # 缓冲区未满，直接在尾部插入行
+        if self.count < self.capacity:
+            self.beginInsertRows(QtCore.QModelIndex(), self.count, self.count)
+            self.prices[self.count] = price
+            self.codes[self.count] = code
+            self.count += 1
+            self.row_count = self.count
+            self.endInsertRows()
+        # 缓冲区已满，最旧的一条移入归档，行数保持不变
+        else:
+            self.archive.append(self.prices[self.head], self.codes[self.head])
+            
+            self.prices[self.head] = price
+            self.codes[self.head] = code
+            self.head = (self.head + 1) % self.capacity
+            
+            self.dataChanged.emit(
+                self.index(0, 1),
+                self.index(self.count - 1, 2)
+            )
+            
+    def get_prints(self) -> List[Tuple[float, str]]:
+        """读取全部成交明细（归档+缓冲区）"""
+        prints: List[Tuple[float, str]] = self.archive.get_prints()
         
-        if "多" in text:
-            self.setForeground(QtGui.QColor("red"))
-        elif "空" in text:
-            self.setForeground(QtGui.QColor("green"))
+        for i in range(self.count):
+            n: int = (self.head + i) % self.capacity
+            prints.append((self.prices[n], INFO_TEXTS[self.codes[n]]))
+            
+        return prints
             
             
 class TickMonitor(QtWidgets.QTabWidget):
     """Tick盘口监控控件"""
     
-    signal = QtCore.Signal(Event)
-    
-    def __init__(self, event_engine: EventEngine) -> None:
+    def __init__(self, bridge: EventBridge, batch_interval: int = 0, capacity: int = 5000) -> None:
         """构造函数"""
         super().__init__()
         
-        self.event_engine = event_engine
+        self.bridge = bridge
+        
+        # 批量刷新间隔（毫秒），为0时逐条刷新
+        self.batch_interval: int = batch_interval
+        self.pending_events: List[Event] = []
+        
+        # 每个合约表格保留的最大明细数量
+        self.capacity: int = capacity
         
         self.ticks = {}
         self.tables = {}
+        self.models: Dict[str, TickModel] = {}
+        
+        # 当前可见表格的数据模型
+        self.active_model: TickModel = None
+        
+        # 所有表格共享的显示样式
+        self.styles: Dict[str, CellStyle] = StyleRegistry.get_styles(14, "yellow")
+        
+        self.currentChanged.connect(self.update_active)
         
         self.register_event()
         
-    def get_table(self, vt_symbol: str) -> QtWidgets.QTableWidget:
+    def get_table(self, vt_symbol: str) -> QtWidgets.QTableView:
         """初始化界面"""
         table = self.tables.get(vt_symbol, None)
         if table:
             return table
         
+        # 创建数据模型
+        model = TickModel(vt_symbol, self.capacity, self)
+        self.models[vt_symbol] = model
+        
         # 创建表格
-        table = QtWidgets.QTableWidget()
+        table = QtWidgets.QTableView()
+        table.setModel(model)
+        table.setItemDelegate(MonitorDelegate(self.styles, table))
         self.tables[vt_symbol] = table
         self.addTab(table, vt_symbol)
-        
-        # 表头列表
-        labels = ["代码", "最新价", "信息"]
-        
-        # 设置列数
-        table.setColumnCount(len(labels))
          
         # 设置水平表头
-        table.setHorizontalHeaderLabels(labels)
-        table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
         
         # 关闭垂直表头
         table.verticalHeader().setVisible(False)
         
         # 禁用表格编辑
-        table.setEditTriggers(table.NoEditTriggers)
+        table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
         
         return table
         
+    def update_active(self) -> None:
+        """只让当前可见的表格刷新界面"""
+        model: TickModel = None
+        
+        if self.isVisible():
+            table = self.currentWidget()
+            if table:
+                model = table.model()
+                
+        if model is self.active_model:
+            return
+        
+        if self.active_model:
+            self.active_model.set_active(False)
+            
+        self.active_model = model
+        
+        if model:
+            model.set_active(True)
+            self.currentWidget().scrollToBottom()
+            
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        """显示时刷新当前表格"""
+        super().showEvent(event)
+        self.update_active()
+        
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        """隐藏时停止刷新所有表格"""
+        super().hideEvent(event)
+        self.update_active()
+        
+    def get_prints(self, vt_symbol: str) -> List[Tuple[float, str]]:
+        """查询合约的全部成交明细"""
+        model: TickModel = self.models.get(vt_symbol, None)
+        if not model:
+            return []
+        return model.get_prints()
+        
     def register_event(self) -> None:
         """处理Tick事件"""
-        self.signal.connect(self.process_tick_event)
-        self.event_engine.register(EVENT_TICK, self.signal.emit)
+        if self.batch_interval:
+            self.timer = QtCore.QTimer(self)
+            self.timer.setSingleShot(True)
+            self.timer.setInterval(self.batch_interval)
+            self.timer.timeout.connect(self.bridge.wrap(EVENT_TICK, self.process_batch))
+            
+            self.bridge.register(EVENT_TICK, self.queue_event)
+        else:
+            self.bridge.register(EVENT_TICK, self.process_tick_event)
+        
+    def queue_event(self, event: Event) -> None:
+        """缓存事件，等待定时器批量刷新"""
+        self.pending_events.append(event)
+        
+        if not self.timer.isActive():
+            self.timer.start()
+            
+    def process_batch(self) -> None:
+        """批量处理缓存的事件"""
+        events: List[Event] = self.pending_events
+        self.pending_events = []
+        
+        # 批量处理期间关闭重绘
+        self.setUpdatesEnabled(False)
+        
+        updated: set = set()
+        for event in events:
+            table = self.insert_tick(event.data)
+            if table:
+                updated.add(table)
+                
+        # 每个表格只滚动一次
+        for table in updated:
+            table.scrollToBottom()
+        
+        self.setUpdatesEnabled(True)
         
     def process_tick_event(self, event: Event) -> None:
         """处理Tick事件"""
-        tick: TickData = event.data
+        table = self.insert_tick(event.data)
+        
+        # 滚动到底部
+        if table:
+            table.scrollToBottom()
+        
+    def insert_tick(self, tick: TickData) -> QtWidgets.QTableView:
+        """将Tick插入对应表格，返回更新的表格"""
         last_tick: TickData = self.ticks.get(tick.vt_symbol, None)
         self.ticks[tick.vt_symbol] = tick
         
         if not last_tick:
-            return
+            return None
         
         # 获取该合约的表格
         table = self.get_table(tick.vt_symbol)
@@ -94,140 +428,433 @@ class TickMonitor(QtWidgets.QTabWidget):
         oi_change: int = tick.open_interest - last_tick.open_interest
         
         if oi_change > 0:
-            oi_str = "开"
+            oi_index = 0
         elif oi_change < 0:
-            oi_str = "平"
+            oi_index = 1
         else:
-            oi_str = "换"
+            oi_index = 2
             
         # 计算方向变化
         if tick.last_price >= last_tick.ask_price_1:
-            direction_str = "多"
+            direction_index = 0
         elif tick.last_price <= last_tick.bid_price_1:
-            direction_str = "空"
+            direction_index = 1
         else:
-            direction_str = "双"
+            direction_index = 2
             
-        # 获取当前行数
-        row = table.rowCount()
+        # 添加到成交明细缓冲区
+        code: int = direction_index * 3 + oi_index
+        model: TickModel = self.models[tick.vt_symbol]
+        model.append_print(tick.last_price, code)
+        
+        # 不可见的表格无需滚动
+        if not model.active:
+            return None
+        return table
+        
         
-        # 在尾部插入行（从索引0开始）
-        table.insertRow(row)
+# 枚举显示文本缓存
+ENUM_TEXTS: Dict[Enum, str] = {}
+
+# 时间显示文本缓存（按当日秒数）
+TIME_TEXTS: Dict[int, str] = {}
+
+
+def format_content(content: object) -> str:
+    """将数据字段转换为显示文本"""
+    if type(content) in (float, int):
+        return str(content)
+    elif isinstance(content, Enum):
+        return format_enum(content)
+    elif isinstance(content, datetime):
+        return format_datetime(content)
+    elif content is None:
+        return ""
+    
+    return content
 
-        # 创建单元格
-        # symbol_cell = QtWidgets.QTableWidgetItem(tick.vt_symbol)
-        # price_cell = QtWidgets.QTableWidgetItem(str(tick.last_price))
-        # info_cell = QtWidgets.QTableWidgetItem(f"{direction_str}{oi_str}")
-        
-        # 设置字体
-        # font = QtGui.QFont("微软雅黑", 14)
-        
-        # symbol_cell.setFont(font)
-        # price_cell.setFont(font)
-        # info_cell.setFont(font)
-        
-        # 设置对齐
-        # symbol_cell.setTextAlignment(QtCore.Qt.AlignCenter)
-        # price_cell.setTextAlignment(QtCore.Qt.AlignCenter)
-        # info_cell.setTextAlignment(QtCore.Qt.AlignCenter)
-        
-        # 设置背景颜色
-        # symbol_cell.setBackground(QtGui.QColor("yellow"))
-        # price_cell.setBackground(QtGui.QColor("yellow"))
-        # info_cell.setBackground(QtGui.QColor("yellow"))
-        
-        # 设置字体颜色
-        # if direction_str == "多":
-        #     info_cell.setForeground(QtGui.QColor("red"))
-        # elif direction_str == "空":
-        #     info_cell.setForeground(QtGui.QColor("green"))
-            
-        # 使用自定义单元格
-        symbol_cell = TickCell(tick.vt_symbol)
-        price_cell = TickCell(str(tick.last_price))
-        info_cell = TickCell(f"{direction_str}{oi_str}")
 
-        # 设置单元格
-        table.setItem(row, 0, symbol_cell)
-        table.setItem(row, 1, price_cell)
-        table.setItem(row, 2, info_cell)
+def format_enum(content: Enum) -> str:
+    """枚举转换为显示文本"""
+    text: str = ENUM_TEXTS.get(content, None)
+    if text is None:
+        if content is None:
+            return ""
+        text = ENUM_TEXTS[content] = content.value
+    return text
+
+
+def format_datetime(content: datetime) -> str:
+    """时间转换为显示文本（精确到秒）"""
+    if content is None:
+        return ""
+    
+    seconds: int = content.hour * 3600 + content.minute * 60 + content.second
+    text: str = TIME_TEXTS.get(seconds, None)
+    if text is None:
+        text = TIME_TEXTS[seconds] = content.strftime("%H:%M:%S")
+    return text
+
+
+def get_formatter(content: object) -> Callable[[object], str]:
+    """根据字段值类型选择格式化函数"""
+    if type(content) in (float, int, str):
+        return str
+    elif isinstance(content, Enum):
+        return format_enum
+    elif isinstance(content, datetime):
+        return format_datetime
+    
+    # 无法确定类型时使用通用转换
+    return format_content
+
+
+def get_values_getter(fields: List[str]) -> Callable[[object], tuple]:
+    """生成一次读取全部字段的函数"""
+    if len(fields) > 1:
+        return attrgetter(*fields)
+    
+    # attrgetter只有一个字段时不返回元组
+    getter: Callable = attrgetter(*fields)
+    return lambda data: (getter(data),)
+
+
+class MonitorRow:
+    """通用监控表格行记录"""
+    
+    __slots__ = ("key", "values", "texts")
+    
+    def __init__(self, key: str, values: tuple, texts: List[str]) -> None:
+        """构造函数"""
+        self.key: str = key
         
-        # 滚动到底部
-        table.scrollToBottom()
+        # 只缓存各列的原始值和显示文本
+        self.values: tuple = values
+        self.texts: List[str] = texts
         
         
-class MonitorCell(QtWidgets.QTableWidgetItem):
-    """通用监控表格单元格"""
+class MonitorModel(QtCore.QAbstractTableModel):
+    """通用监控数据模型"""
     
-    def __init__(self, content: object = None) -> None:
+    def __init__(self, headers: Dict[str, str], parent: QtCore.QObject = None) -> None:
         """构造函数"""
-        super().__init__()
+        super().__init__(parent)
+        
+        self.labels: List[str] = list(headers.keys())
+        self.fields: List[str] = list(headers.values())
+        
+        # 字段读取函数，格式化函数在收到第一条数据时确定
+        self.get_values: Callable[[object], tuple] = get_values_getter(self.fields)
+        self.formatters: Tuple[Callable[[object], str], ...] = ()
+        
+        # 行记录按到达顺序追加存储，显示时最新的在最前
+        self.rows: List[MonitorRow] = []
+        
+        # 主键到存储位置的索引
+        self.keys: Dict[str, int] = {}
+        
+        # 单元格更新和跳过计数
+        self.updated_count: int = 0
+        self.skipped_count: int = 0
+        
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        """行数"""
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+    
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        """列数"""
+        if parent.isValid():
+            return 0
+        return len(self.fields)
+    
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole) -> object:
+        """按需生成单元格显示数据"""
+        if role == QtCore.Qt.DisplayRole:
+            row: MonitorRow = self.rows[len(self.rows) - 1 - index.row()]
+            return row.texts[index.column()]
         
-        font = QtGui.QFont("微软雅黑", 12)
-        self.setFont(font)
+        return None
+    
+    def headerData(self, section: int, orientation: QtCore.Qt.Orientation, role: int = QtCore.Qt.DisplayRole) -> object:
+        """表头数据"""
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.labels[section]
+        
+        return None
+    
+    def insert_row(self, key: str, data: object) -> None:
+        """在头部插入新的一行"""
+        values: tuple = self.get_values(data)
+        
+        if not self.formatters:
+            self.formatters = tuple(get_formatter(field_value) for field_value in values)
+            
+        texts: List[str] = [
+            formatter(field_value)
+            for formatter, field_value in zip(self.formatters, values)
+        ]
+        row: MonitorRow = MonitorRow(key, values, texts)
+        
+        # 显示在第0行，存储在尾部
+        self.beginInsertRows(QtCore.QModelIndex(), 0, 0)
+        self.keys[key] = len(self.rows)
+        self.rows.append(row)
+        self.endInsertRows()
+        
+    def load_rows(self, items: List[Tuple[str, object]]) -> None:
+        """批量插入多行新数据，在一次模型重置中完成"""
+        rows: List[MonitorRow] = self.rows
+        keys: Dict[str, int] = self.keys
+        
+        # 重置期间不发出逐行的插入信号
+        self.beginResetModel()
+        
+        for key, data in items:
+            values: tuple = self.get_values(data)
+            
+            if not self.formatters:
+                self.formatters = tuple(get_formatter(field_value) for field_value in values)
+                
+            texts: List[str] = [
+                formatter(field_value)
+                for formatter, field_value in zip(self.formatters, values)
+            ]
+            
+            if key:
+                keys[key] = len(rows)
+            rows.append(MonitorRow(key, values, texts))
+            
+        self.endResetModel()
         
-        self.setTextAlignment(QtCore.Qt.AlignCenter)
+    def update_row(self, key: str, data: object) -> None:
+        """更新已有的一行"""
+        position: int = self.keys[key]
+        row: MonitorRow = self.rows[position]
+        
+        values: tuple = self.get_values(data)
+        old_values: tuple = row.values
+        
+        # 整行未变化，直接跳过
+        if values == old_values:
+            self.skipped_count += len(values)
+            return
         
-        if content:
-            self.set_content(content)   
+        row.values = values
+        texts: List[str] = row.texts
+        formatters: tuple = self.formatters
         
-    def set_content(self, content: object) -> None:
-        """设置内容"""
-        if type(content) in {float, int}:
-            content = str(content)
-        elif isinstance(content, Enum):
-            content = content.value
-        elif isinstance(content, datetime):
-            content = content.strftime("%H:%M:%S")
+        # 只重新格式化发生变化的字段
+        first: int = -1
+        last: int = -1
+        changed: int = 0
         
-        self.setText(content)
+        for column, field_value in enumerate(values):
+            if field_value == old_values[column]:
+                continue
+            
+            texts[column] = formatters[column](field_value)
+            changed += 1
+            
+            if first < 0:
+                first = column
+            last = column
+            
+        self.updated_count += changed
+        self.skipped_count += len(values) - changed
+        
+        # 只通知视图刷新变化的列范围
+        n: int = len(self.rows) - 1 - position
+        self.dataChanged.emit(
+            self.index(n, first),
+            self.index(n, last)
+        )
 
         
-class BaseMonitor(QtWidgets.QTableWidget):
+class BaseMonitor(QtWidgets.QTableView):
     """通用数据监控控件"""
     
-    signal = QtCore.Signal(Event)
-    
     headers: Dict[str, str] = {}
     event_type: str = ""
     data_key: str = ""
     
-    def __init__(self, event_engine: EventEngine) -> None:
+    # 是否只保留每个主键的最新数据（仅对配置了主键的监控生效）
+    conflate: bool = False
+    
+    # 一次载入的新增行达到该数量时改为整表重置
+    bulk_threshold: int = 50
+    
+    # 逐条刷新时，事件间隔小于该值（秒）视为连续到达
+    burst_gap: float = 0.05
+    
+    def __init__(self, bridge: EventBridge, batch_interval: int = 0) -> None:
         """构造函数"""
         super().__init__()
         
-        self.event_engine = event_engine
+        self.bridge = bridge
+        
+        # 批量刷新间隔（毫秒），为0时逐条刷新
+        self.batch_interval: int = batch_interval
+        self.pending_events: List[Event] = []
+        
+        # 合并后等待刷新的主键数据
+        self.dirty_data: Dict[str, object] = {}
         
-        self.cells: Dict[str, Dict(str, QtWidgets.QTableWidgetItem)] = {}
+        # 控件隐藏期间积累的数据
+        self.hidden_data: Dict[str, object] = {}
+        self.hidden_rows: List[object] = []
+        
+        # 逐条刷新时连续到达的事件数量和缓存的数据
+        self.burst_time: float = 0
+        self.burst_count: int = 0
+        self.burst_data: List[object] = []
         
         self.init_ui()
         self.register_event()
         
     def init_ui(self) -> None:
         """初始化界面"""
-        # 表头列表
-        labels = list(self.headers.keys())
+        # 创建数据模型（表头来自模型）
+        self.table_model: MonitorModel = MonitorModel(self.headers, self)
+        self.setModel(self.table_model)
         
-        # 设置列数
-        self.setColumnCount(len(labels))
+        # 使用共享样式绘制单元格
+        styles: Dict[str, CellStyle] = StyleRegistry.get_styles(12)
+        self.setItemDelegate(MonitorDelegate(styles, self))
         
         # 设置水平表头
-        self.setHorizontalHeaderLabels(labels)
-        self.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        self.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
         
         # 关闭垂直表头
         self.verticalHeader().setVisible(False)
         
         # 禁用表格编辑
-        self.setEditTriggers(self.NoEditTriggers)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
         
         # 设置最窄宽度
         self.setMinimumWidth(1200)
         
     def register_event(self) -> None:
         """注册事件监听"""
-        self.signal.connect(self.process_event)
-        self.event_engine.register(self.event_type, self.signal.emit)
+        # 合并模式下即使逐条刷新，也要等本轮事件派发完再统一处理
+        if self.batch_interval or (self.conflate and self.data_key):
+            self.timer = QtCore.QTimer(self)
+            self.timer.setSingleShot(True)
+            self.timer.setInterval(self.batch_interval)
+            self.timer.timeout.connect(self.bridge.wrap(self.event_type, self.process_batch))
+            
+            self.bridge.register(self.event_type, self.queue_event)
+        else:
+            # 连续到达的事件攒够一个间隔后一次载入（只有密集到达时才会延后显示）
+            self.burst_timer = QtCore.QTimer(self)
+            self.burst_timer.setSingleShot(True)
+            self.burst_timer.setInterval(int(self.burst_gap * 1000))
+            self.burst_timer.timeout.connect(self.bridge.wrap(self.event_type, self.process_burst))
+            
+            self.bridge.register(self.event_type, self.receive_event)
+            
+    def queue_event(self, event: Event) -> None:
+        """缓存事件，等待定时器批量刷新"""
+        # 合并模式下只保留每个主键的最新数据
+        if self.conflate and self.data_key:
+            data: object = event.data
+            self.dirty_data[getattr(data, self.data_key)] = data
+        else:
+            self.pending_events.append(event)
+        
+        if not self.timer.isActive():
+            self.timer.start()
+            
+    def process_batch(self) -> None:
+        """批量处理缓存的事件"""
+        events: List[Event] = self.pending_events
+        self.pending_events = []
+        
+        # 合并后的主键数据每个主键只处理一次
+        dirty_data: Dict[str, object] = self.dirty_data
+        self.dirty_data = {}
+        
+        datas: List[object] = [event.data for event in events]
+        datas.extend(dirty_data.values())
+        self.load_data(datas)
+        
+    def receive_event(self, event: Event) -> None:
+        """逐条刷新模式下接收事件，连续密集到达时改为批量载入"""
+        now: float = perf_counter()
+        
+        if now - self.burst_time < self.burst_gap:
+            self.burst_count += 1
+        else:
+            self.burst_count = 0
+        self.burst_time = now
+        
+        # 已经开始缓存时后续数据也要缓存，保持到达顺序
+        if self.burst_data or self.burst_count >= self.bulk_threshold:
+            self.burst_data.append(event.data)
+            
+            if not self.burst_timer.isActive():
+                self.burst_timer.start()
+        else:
+            self.process_event(event)
+            
+    def process_burst(self) -> None:
+        """载入连续到达的数据"""
+        datas: List[object] = self.burst_data
+        self.burst_data = []
+        
+        self.load_data(datas)
+        
+    def load_data(self, datas: List[object]) -> None:
+        """批量载入数据（登录后的查询结果、事件日志恢复等），新增行较多时一次重置模型"""
+        if not datas:
+            return
+        
+        # 控件不可见时先缓存，显示时再载入
+        if not self.isVisible():
+            if self.data_key:
+                for data in datas:
+                    self.hidden_data[getattr(data, self.data_key)] = data
+            else:
+                self.hidden_rows.extend(datas)
+            return
+        
+        # 载入期间暂停排序和重绘
+        sorting: bool = self.isSortingEnabled()
+        self.setSortingEnabled(False)
+        self.setUpdatesEnabled(False)
+        
+        # 区分新增行和已有行，同一主键只保留最新数据
+        new_items: List[Tuple[str, object]] = []
+        old_items: List[Tuple[str, object]] = []
+        
+        if self.data_key:
+            latest: Dict[str, object] = {}
+            for data in datas:
+                latest[getattr(data, self.data_key)] = data
+                
+            keys: Dict[str, int] = self.table_model.keys
+            for key, data in latest.items():
+                if key in keys:
+                    old_items.append((key, data))
+                else:
+                    new_items.append((key, data))
+        else:
+            new_items = [("", data) for data in datas]
+            
+        # 新增行较多或者表格为空（快照）时整表重置，否则逐行插入
+        if new_items and (len(new_items) >= self.bulk_threshold or not self.table_model.rows):
+            self.table_model.load_rows(new_items)
+        else:
+            for key, data in new_items:
+                self.insert_new_row(key, data)
+                
+        # 已有行只刷新变化的字段，保留选中状态
+        for key, data in old_items:
+            self.update_old_row(key, data)
+            
+        self.setUpdatesEnabled(True)
+        self.setSortingEnabled(sorting)
         
     def process_event(self, event: Event) -> None:
         """处理事件"""
@@ -236,38 +863,54 @@ class BaseMonitor(QtWidgets.QTableWidget):
         # 如果配置了主键，则采用刷新更新
         if self.data_key:
             key: str = getattr(data, self.data_key)
-            
-            # 如果是新的数据
-            if key not in self.cells:
-                self.insert_new_row(key, data)
-            else:
-                self.update_old_row(key, data)
+            self.process_data(key, data)
+        # 控件不可见时先缓存，显示时再插入
+        elif not self.isVisible():
+            self.hidden_rows.append(data)
         else:
             self.insert_new_row("", data)
+            
+    def process_data(self, key: str, data: object) -> None:
+        """按主键插入或更新数据"""
+        # 控件不可见时只记录脏数据
+        if not self.isVisible():
+            self.hidden_data[key] = data
+            return
+        
+        # 如果是新的数据
+        if key not in self.table_model.keys:
+            self.insert_new_row(key, data)
+        else:
+            self.update_old_row(key, data)
+            
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        """控件显示时一次性补齐隐藏期间的更新"""
+        super().showEvent(event)
+        
+        if not self.hidden_data and not self.hidden_rows:
+            return
+        
+        hidden_data: Dict[str, object] = self.hidden_data
+        hidden_rows: List[object] = self.hidden_rows
+        self.hidden_data = {}
+        self.hidden_rows = []
+        
+        self.load_data(hidden_rows + list(hidden_data.values()))
+        
+    def get_cell_counts(self) -> Dict[str, int]:
+        """查询单元格更新和跳过的数量"""
+        return {
+            "updated": self.table_model.updated_count,
+            "skipped": self.table_model.skipped_count
+        }
         
     def insert_new_row(self, key: str, data: object) -> None:
         """插入新的一行"""
-        # 在头部插入行
-        self.insertRow(0)
-        
-        # 添加单元格
-        cells = {}
-            
-        for colume, field_name in enumerate(self.headers.values()):
-            field_value: object = getattr(data, field_name)
-            cell: MonitorCell = MonitorCell(field_value)
-            self.setItem(0, colume, cell)
-            cells[field_name] = cell
-                
-        self.cells[key] = cells
+        self.table_model.insert_row(key, data)
         
     def update_old_row(self, key: str, data: object) -> None:
         """更新老的一行"""
-        cells = self.cells[key]
-            
-        for field_name, cell in cells.items():
-            field_value: object = getattr(data, field_name)
-            cell.set_content(field_value)
+        self.table_model.update_row(key, data)
             
             
 class OrderMonitor(BaseMonitor):
@@ -321,6 +964,7 @@ class PositionMonitor(BaseMonitor):
     }
     event_type: str = EVENT_POSITION
     data_key: str = "vt_positionid"
+    conflate: bool = True
     
     
 class AccountMonitor(BaseMonitor):
@@ -343,10 +987,10 @@ class LogMonitor(BaseMonitor):
     }
     event_type: str = EVENT_LOG
     
-    def __init__(self, event_engine: EventEngine) -> None:
-        super().__init__(event_engine)
+    def __init__(self, bridge: EventBridge, batch_interval: int = 0) -> None:
+        super().__init__(bridge, batch_interval)
         
-        self.horizontalHeader().setSectionResizeMode(0, self.horizontalHeader().ResizeToContents)
+        self.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.ResizeMode.ResizeToContents)
     
     
 class MarketMonitor(BaseMonitor):
@@ -369,3 +1013,4 @@ class MarketMonitor(BaseMonitor):
     }
     event_type: str = EVENT_TICK
     data_key: str = "vt_symbol"
+    conflate: bool = True
@@ -0,0 +1,146 @@
+import json
+from datetime import datetime
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+
+def get_handler_name(handler: Callable) -> str:
+    """获取处理函数名（方法带上类名）"""
+    name: str = getattr(handler, "__name__", handler.__class__.__name__)
+    
+    obj = getattr(handler, "__self__", None)
+    if obj is not None:
+        name = f"{obj.__class__.__name__}.{name}"
+    return name
+
+
+class HandlerStats:
+    """单个处理函数在一种事件类型上的耗时统计"""
+    
+    __slots__ = ("type", "name", "count", "total", "max", "last_count", "last_total")
+    
+    def __init__(self, type: str, name: str) -> None:
+        """构造函数"""
+        self.type: str = type
+        self.name: str = name
+        
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+        
+        # 上次查询时的计数，用于计算每秒统计
+        self.last_count: int = 0
+        self.last_total: float = 0
+
+
+class HandlerProfiler:
+    """事件处理函数的耗时统计"""
+    
+    def __init__(self) -> None:
+        """构造函数"""
+        # （事件类型，处理函数名）到统计数据
+        self.stats: Dict[Tuple[str, str], HandlerStats] = {}
+        
+        self.start_time: float = perf_counter()
+        self.last_time: float = self.start_time
+    
+    def wrap(self, type: str, handler: Callable) -> Callable:
+        """包装处理函数（或其批量刷新函数），每次调用时计时"""
+        name: str = get_handler_name(handler)
+        
+        key: Tuple[str, str] = (type, name)
+        stats: HandlerStats = self.stats.get(key, None)
+        if not stats:
+            stats = HandlerStats(type, name)
+            self.stats[key] = stats
+        
+        @wraps(handler)
+        def profiled(*args) -> None:
+            """计时调用处理函数"""
+            start: float = perf_counter()
+            handler(*args)
+            elapsed: float = perf_counter() - start
+            
+            stats.count += 1
+            stats.total += elapsed
+            if elapsed > stats.max:
+                stats.max = elapsed
+        
+        return profiled
+    
+    def get_stats(self) -> List[dict]:
+        """查询各处理函数的耗时统计（毫秒），按总耗时从大到小排序"""
+        now: float = perf_counter()
+        duration: float = now - self.last_time
+        self.last_time = now
+        
+        all_stats: List[dict] = []
+        
+        for stats in self.stats.values():
+            count: int = stats.count
+            total: float = stats.total
+            
+            if count:
+                mean: float = total / count * 1000
+            else:
+                mean: float = 0
+            
+            all_stats.append({
+                "type": stats.type,
+                "handler": stats.name,
+                "count": count,
+                "total": total * 1000,
+                "mean": mean,
+                "max": stats.max * 1000,
+                "rate": (count - stats.last_count) / duration,
+                "load": (total - stats.last_total) / duration * 1000
+            })
+            
+            stats.last_count = count
+            stats.last_total = total
+        
+        all_stats.sort(key=lambda d: d["total"], reverse=True)
+        return all_stats
+    
+    def save_json(self, path: str) -> None:
+        """将累计统计导出为JSON文件"""
+        all_stats: List[dict] = []
+        
+        for stats in self.stats.values():
+            if stats.count:
+                mean: float = stats.total / stats.count * 1000
+            else:
+                mean: float = 0
+            
+            all_stats.append({
+                "type": stats.type,
+                "handler": stats.name,
+                "count": stats.count,
+                "total_ms": stats.total * 1000,
+                "mean_ms": mean,
+                "max_ms": stats.max * 1000
+            })
+        
+        all_stats.sort(key=lambda d: d["total_ms"], reverse=True)
+        
+        data: dict = {
+            "datetime": datetime.now().isoformat(),
+            "duration": perf_counter() - self.start_time,
+            "handlers": all_stats
+        }
+        
+        with open(path, mode="w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+    
+    def clear(self) -> None:
+        """清空统计"""
+        for stats in self.stats.values():
+            stats.count = 0
+            stats.total = 0
+            stats.max = 0
+            stats.last_count = 0
+            stats.last_total = 0
+        
+        self.start_time = perf_counter()
+        self.last_time = self.start_time
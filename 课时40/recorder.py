@@ -0,0 +1,213 @@
+import json
+from operator import attrgetter
+from pathlib import Path
+from queue import Queue
+from threading import Thread
+from time import perf_counter
+from typing import BinaryIO, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from vnpy.event import EventEngine, Event
+from vnpy.trader.event import EVENT_TICK, EVENT_TIMER
+from vnpy.trader.object import TickData
+
+
+# 按列保存的浮点字段（时间戳单独保存为微秒整数）
+FLOAT_FIELDS: List[str] = [
+    "volume", "turnover", "open_interest", "last_price", "last_volume",
+    "limit_up", "limit_down", "open_price", "high_price", "low_price", "pre_close",
+    "bid_price_1", "bid_price_2", "bid_price_3", "bid_price_4", "bid_price_5",
+    "ask_price_1", "ask_price_2", "ask_price_3", "ask_price_4", "ask_price_5",
+    "bid_volume_1", "bid_volume_2", "bid_volume_3", "bid_volume_4", "bid_volume_5",
+    "ask_volume_1", "ask_volume_2", "ask_volume_3", "ask_volume_4", "ask_volume_5",
+]
+
+# 每列的固定数据类型，datetime为1970年以来的微秒数
+TICK_DTYPE: np.dtype = np.dtype([("datetime", "<i8")] + [(name, "<f8") for name in FLOAT_FIELDS])
+
+SCHEMA_NAME: str = "schema.json"
+
+
+def get_column_path(folder: Path, name: str) -> Path:
+    """列文件路径"""
+    return folder.joinpath(f"{name}.bin")
+
+
+class TickBuffer:
+    """单个合约的预分配行情缓冲区"""
+    
+    __slots__ = ("data", "count", "start_time")
+    
+    def __init__(self, capacity: int) -> None:
+        """构造函数"""
+        self.data: np.ndarray = np.empty(capacity, dtype=TICK_DTYPE)
+        self.count: int = 0
+        self.start_time: float = perf_counter()
+
+
+class TickRecorder:
+    """按列录制行情到磁盘，写盘在后台线程完成"""
+    
+    def __init__(
+        self,
+        event_engine: EventEngine,
+        path: str,
+        capacity: int = 4096,
+        flush_interval: float = 1
+    ) -> None:
+        """构造函数"""
+        self.event_engine: EventEngine = event_engine
+        self.root: Path = Path(path)
+        
+        # 缓冲区写满或者超过刷新间隔后整体交给写盘线程
+        self.capacity: int = capacity
+        self.flush_interval: float = flush_interval
+        self.buffers: Dict[str, TickBuffer] = {}
+        
+        # 各合约行情时间的时区，写入列定义供回放还原
+        self.timezones: Dict[str, str] = {}
+        
+        self.get_values: Callable[[TickData], tuple] = attrgetter(*FLOAT_FIELDS)
+        
+        # 写盘线程，每个合约的列文件保持打开
+        self.queue: Queue = Queue()
+        self.files: Dict[str, List[BinaryIO]] = {}
+        self.thread: Thread = Thread(target=self.run, daemon=True)
+        
+        self.tick_count: int = 0
+        self.write_count: int = 0
+    
+    def start(self) -> None:
+        """开始录制"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.thread.start()
+        
+        self.event_engine.register(EVENT_TICK, self.process_tick_event)
+        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
+    
+    def stop(self) -> None:
+        """停止录制，写入剩余的数据（在事件引擎停止后调用）"""
+        self.event_engine.unregister(EVENT_TICK, self.process_tick_event)
+        self.event_engine.unregister(EVENT_TIMER, self.process_timer_event)
+        
+        self.flush(0)
+        
+        self.queue.put(None)
+        self.thread.join()
+    
+    def process_tick_event(self, event: Event) -> None:
+        """写入缓冲区（运行在事件引擎线程，不做任何磁盘操作）"""
+        tick: TickData = event.data
+        
+        buffer: TickBuffer = self.buffers.get(tick.vt_symbol, None)
+        if not buffer:
+            buffer = TickBuffer(self.capacity)
+            self.buffers[tick.vt_symbol] = buffer
+            
+            if tick.vt_symbol not in self.timezones:
+                self.timezones[tick.vt_symbol] = getattr(tick.datetime.tzinfo, "key", "")
+        
+        timestamp: int = int(tick.datetime.timestamp() * 1_000_000)
+        buffer.data[buffer.count] = (timestamp, *self.get_values(tick))
+        buffer.count += 1
+        self.tick_count += 1
+        
+        # 写满后换一个新的缓冲区
+        if buffer.count == self.capacity:
+            self.queue.put((tick.vt_symbol, buffer.data))
+            self.buffers[tick.vt_symbol] = TickBuffer(self.capacity)
+    
+    def process_timer_event(self, event: Event) -> None:
+        """定时提交未写满的缓冲区（运行在事件引擎线程）"""
+        self.flush(self.flush_interval)
+    
+    def flush(self, interval: float) -> None:
+        """提交超过刷新间隔的缓冲区"""
+        now: float = perf_counter()
+        
+        for vt_symbol, buffer in list(self.buffers.items()):
+            if not buffer.count or now - buffer.start_time < interval:
+                continue
+            
+            self.queue.put((vt_symbol, buffer.data[:buffer.count]))
+            self.buffers[vt_symbol] = TickBuffer(self.capacity)
+    
+    def run(self) -> None:
+        """写盘线程"""
+        while True:
+            item: Tuple[str, np.ndarray] = self.queue.get()
+            if item is None:
+                break
+            
+            vt_symbol, data = item
+            self.write(vt_symbol, data)
+        
+        for files in self.files.values():
+            for f in files:
+                f.close()
+    
+    def write(self, vt_symbol: str, data: np.ndarray) -> None:
+        """追加写入每一列"""
+        files: List[BinaryIO] = self.files.get(vt_symbol, None)
+        if not files:
+            files = self.open_files(vt_symbol)
+        
+        for name, f in zip(TICK_DTYPE.names, files):
+            f.write(np.ascontiguousarray(data[name]).tobytes())
+        
+        # 刷新到操作系统，内存映射读取时可以看到
+        for f in files:
+            f.flush()
+        
+        self.write_count += len(data)
+    
+    def open_files(self, vt_symbol: str) -> List[BinaryIO]:
+        """打开合约的列文件，首次创建时写入列定义"""
+        folder: Path = self.root.joinpath(vt_symbol)
+        folder.mkdir(exist_ok=True)
+        
+        # 先创建列文件，读取方看到列定义时列文件一定存在
+        files: List[BinaryIO] = [open(get_column_path(folder, name), "ab") for name in TICK_DTYPE.names]
+        self.files[vt_symbol] = files
+        
+        schema_path: Path = folder.joinpath(SCHEMA_NAME)
+        if not schema_path.exists():
+            schema: dict = {
+                "vt_symbol": vt_symbol,
+                "timezone": self.timezones.get(vt_symbol, ""),
+                "fields": [[name, TICK_DTYPE[name].str] for name in TICK_DTYPE.names]
+            }
+            with open(schema_path, mode="w", encoding="utf-8") as f:
+                json.dump(schema, f, indent=4)
+        
+        return files
+
+
+def load_schema(folder: str) -> dict:
+    """读取一个合约的列定义"""
+    with open(Path(folder).joinpath(SCHEMA_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_columns(folder: str) -> Dict[str, np.ndarray]:
+    """以内存映射方式打开一个合约的列文件（只读，按最短的列对齐）"""
+    folder: Path = Path(folder)
+    schema: dict = load_schema(folder)
+    
+    fields: List[Tuple[str, np.dtype]] = [(name, np.dtype(dtype)) for name, dtype in schema["fields"]]
+    
+    # 写盘中途的列可能长短不一
+    length: int = min(
+        get_column_path(folder, name).stat().st_size // dtype.itemsize
+        for name, dtype in fields
+    )
+    
+    columns: Dict[str, np.ndarray] = {}
+    for name, dtype in fields:
+        if length:
+            columns[name] = np.memmap(get_column_path(folder, name), dtype=dtype, mode="r", shape=(length,))
+        else:
+            columns[name] = np.empty(0, dtype=dtype)
+    
+    return columns
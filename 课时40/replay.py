@@ -0,0 +1,200 @@
+import sys
+from argparse import ArgumentParser
+from datetime import datetime
+from heapq import merge
+from pathlib import Path
+from threading import Thread
+from time import perf_counter, sleep
+from typing import Dict, Iterator, List, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from PySide6 import QtWidgets
+
+from vnpy.event import EventEngine, Event
+from vnpy.trader.engine import MainEngine
+from vnpy.trader.constant import Exchange
+from vnpy.trader.event import EVENT_TICK, EVENT_LOG
+from vnpy.trader.object import TickData, LogData
+
+from recorder import FLOAT_FIELDS, SCHEMA_NAME, load_columns, load_schema
+from mainwindow import MainWindow
+
+
+# 每次从内存映射中读取的行数
+CHUNK_SIZE: int = 4096
+
+# 列定义中没有记录时区时，按国内期货接口的时区还原
+CHINA_TZ: ZoneInfo = ZoneInfo("Asia/Shanghai")
+
+
+def iter_rows(index: int, columns: Dict[str, np.ndarray]) -> Iterator[Tuple[int, int, tuple]]:
+    """按块读取一个合约的列数据，逐行返回（时间戳，合约序号，浮点字段）"""
+    timestamps: np.ndarray = columns["datetime"]
+    float_columns: List[np.ndarray] = [columns[name] for name in FLOAT_FIELDS]
+    
+    for start in range(0, len(timestamps), CHUNK_SIZE):
+        end: int = start + CHUNK_SIZE
+        
+        chunk_timestamps: list = timestamps[start:end].tolist()
+        chunk_values: list = list(zip(*[column[start:end].tolist() for column in float_columns]))
+        
+        for timestamp, values in zip(chunk_timestamps, chunk_values):
+            yield timestamp, index, values
+
+
+class TickReplayer:
+    """将录制的行情按时间顺序回放到事件引擎"""
+    
+    def __init__(
+        self,
+        event_engine: EventEngine,
+        path: str,
+        vt_symbols: List[str] = None,
+        speed: float = 1
+    ) -> None:
+        """构造函数"""
+        self.event_engine: EventEngine = event_engine
+        self.root: Path = Path(path)
+        
+        # 默认回放目录下录制的所有合约
+        if not vt_symbols:
+            vt_symbols = [p.parent.name for p in sorted(self.root.glob(f"*/{SCHEMA_NAME}"))]
+        self.vt_symbols: List[str] = vt_symbols
+        
+        # 回放倍速，0表示不限速
+        self.speed: float = speed
+        
+        self.count: int = 0
+        self.start_time: float = 0
+        self.end_time: float = 0
+        
+        self.active: bool = False
+        self.thread: Thread = Thread(target=self.run, daemon=True)
+    
+    def start(self) -> None:
+        """开始回放"""
+        self.active = True
+        self.thread.start()
+    
+    def stop(self) -> None:
+        """停止回放"""
+        self.active = False
+        self.thread.join()
+    
+    def set_speed(self, speed: float) -> None:
+        """调整回放倍速，从当前位置开始生效"""
+        self.speed = speed
+    
+    def run(self) -> None:
+        """回放线程：多路归并后按原始时间间隔推送"""
+        symbols: List[Tuple[str, Exchange, ZoneInfo]] = []
+        iterators: List[Iterator] = []
+        
+        for index, vt_symbol in enumerate(self.vt_symbols):
+            folder: Path = self.root.joinpath(vt_symbol)
+            
+            timezone: str = load_schema(folder).get("timezone", "")
+            tz: ZoneInfo = ZoneInfo(timezone) if timezone else CHINA_TZ
+            
+            symbol, exchange_str = vt_symbol.rsplit(".", 1)
+            symbols.append((symbol, Exchange(exchange_str), tz))
+            
+            columns: Dict[str, np.ndarray] = load_columns(folder)
+            iterators.append(iter_rows(index, columns))
+        
+        self.count = 0
+        self.start_time = perf_counter()
+        
+        # 节奏基准：（行情时间戳，本地时间，倍速），倍速变化后重新设定
+        base: tuple = None
+        
+        # 多路堆归并，各合约内部已按时间排序
+        for timestamp, index, values in merge(*iterators):
+            if not self.active:
+                break
+            
+            speed: float = self.speed
+            if speed:
+                now: float = perf_counter()
+                
+                if not base or base[2] != speed:
+                    base = (timestamp, now, speed)
+                
+                # 领先超过1毫秒才等待，避免频繁休眠（分段等待以便及时响应停止和调速）
+                target: float = base[1] + (timestamp - base[0]) / 1_000_000 / speed
+                delay: float = target - now
+                
+                while delay > 0.001 and self.active and self.speed == speed:
+                    sleep(min(delay, 0.1))
+                    delay = target - perf_counter()
+            else:
+                base = None
+            
+            symbol, exchange, tz = symbols[index]
+            tick: TickData = TickData(
+                gateway_name="REPLAY",
+                symbol=symbol,
+                exchange=exchange,
+                datetime=datetime.fromtimestamp(timestamp / 1_000_000, tz),
+                **dict(zip(FLOAT_FIELDS, values))
+            )
+            
+            # 和接口推送一样，同时推送按代码细分的事件
+            self.event_engine.put(Event(EVENT_TICK, tick))
+            self.event_engine.put(Event(EVENT_TICK + tick.vt_symbol, tick))
+            self.count += 1
+        
+        self.end_time = perf_counter()
+        self.active = False
+        
+        rate: dict = self.get_rate()
+        log: LogData = LogData(
+            gateway_name="REPLAY",
+            msg=f"回放结束，共{rate['count']}笔行情，平均{rate['rate']:.0f}笔/秒"
+        )
+        self.event_engine.put(Event(EVENT_LOG, log))
+    
+    def get_rate(self) -> Dict[str, float]:
+        """查询已回放的行情数和实际回放速率"""
+        if self.active or not self.end_time:
+            end_time: float = perf_counter()
+        else:
+            end_time: float = self.end_time
+        
+        elapsed: float = end_time - self.start_time if self.start_time else 0
+        
+        return {
+            "count": self.count,
+            "elapsed": elapsed,
+            "rate": self.count / elapsed if elapsed else 0
+        }
+
+
+def run() -> None:
+    """在主窗口中回放录制的行情（不连接任何接口）"""
+    parser = ArgumentParser(description="行情回放")
+    parser.add_argument("path", help="录制目录")
+    parser.add_argument("--speed", type=float, default=1, help="回放倍速，0表示不限速")
+    parser.add_argument("--symbols", nargs="*", default=None, help="回放的本地代码，默认全部")
+    args = parser.parse_args()
+    
+    qapp = QtWidgets.QApplication(sys.argv[:1])
+    
+    event_engine: EventEngine = EventEngine()
+    main_engine: MainEngine = MainEngine(event_engine)
+    
+    # 回放不能读写实盘的事件日志
+    main_window = MainWindow(main_engine, event_engine, journal_enabled=False)
+    main_window.showMaximized()
+    
+    replayer: TickReplayer = TickReplayer(event_engine, args.path, args.symbols, args.speed)
+    replayer.start()
+    
+    qapp.exec()
+    
+    replayer.stop()
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,43 @@
+from typing import Callable, Iterable, Set, Union
+
+from vnpy.event import EventEngine, Event
+from vnpy.trader.event import EVENT_TICK
+
+from bridge import EventBridge
+
+
+class TickRouter:
+    """按合约代码路由行情事件"""
+    
+    def __init__(self, event_engine: Union[EventEngine, EventBridge], handler: Callable[[Event], None]) -> None:
+        """构造函数（可以直接注册到事件引擎，也可以注册到GUI桥接）"""
+        self.event_engine: Union[EventEngine, EventBridge] = event_engine
+        self.handler: Callable[[Event], None] = handler
+        
+        self.vt_symbols: Set[str] = set()
+        
+    def set_symbols(self, vt_symbols: Iterable[str]) -> None:
+        """设置需要接收行情的合约集合"""
+        vt_symbols: Set[str] = set(vt_symbols)
+        
+        # 注销不再需要的合约
+        for vt_symbol in self.vt_symbols - vt_symbols:
+            self.event_engine.unregister(EVENT_TICK + vt_symbol, self.handler)
+        
+        # 注册新增的合约，只有该合约的行情才会推送给处理函数
+        for vt_symbol in vt_symbols - self.vt_symbols:
+            self.event_engine.register(EVENT_TICK + vt_symbol, self.handler)
+            
+        self.vt_symbols = vt_symbols
+        
+    def add_symbol(self, vt_symbol: str) -> None:
+        """添加合约"""
+        self.set_symbols(self.vt_symbols | {vt_symbol})
+        
+    def remove_symbol(self, vt_symbol: str) -> None:
+        """移除合约"""
+        self.set_symbols(self.vt_symbols - {vt_symbol})
+        
+    def clear(self) -> None:
+        """移除全部合约"""
+        self.set_symbols(set())
@@ -8,9 +8,17 @@ from vnpy.event import EventEngine
 from vnpy.trader.engine import MainEngine
 from vnpy_tts import TtsGateway as Gateway
 
+# 离线测试时改用本地模拟接口（注释掉上一行导入）
+# from sim_gateway import SimGateway as Gateway
+
 from mainwindow import MainWindow
+from watchdog import StallWatchdog
+from recorder import TickRecorder
 
 gateway_name: str = Gateway.default_name
+
+# 行情录制目录，为空时不录制
+record_path: str = ""
         
 
 def run() -> None:
@@ -43,12 +51,27 @@ def run() -> None:
     main_engine: MainEngine = MainEngine(event_engine)
     main_engine.add_gateway(Gateway)
     
+    # 按列录制收到的行情
+    if record_path:
+        recorder = TickRecorder(event_engine, record_path)
+        recorder.start()
+    
     # 创建控件
     main_window = MainWindow(main_engine, event_engine)
     main_window.showMaximized()
     
+    # 监视界面卡顿（超过100毫秒）
+    watchdog = StallWatchdog(main_engine, threshold=0.1)
+    watchdog.start()
+    
     # 运行应用
     qapp.exec()
+    
+    watchdog.stop()
+    
+    # 事件引擎已随主引擎关闭，写入剩余的行情
+    if record_path:
+        recorder.stop()
 
 
 if __name__ == '__main__':
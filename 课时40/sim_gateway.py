@@ -0,0 +1,532 @@
+import random
+from bisect import insort
+from copy import copy
+from datetime import datetime
+from itertools import count
+from queue import Queue, Empty
+from threading import Thread
+from time import perf_counter
+from typing import Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+from vnpy.event import EventEngine
+from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.utility import round_to
+from vnpy.trader.constant import Exchange, Product, Direction, Offset, Status, OrderType
+from vnpy.trader.object import (
+    TickData,
+    OrderData,
+    TradeData,
+    PositionData,
+    AccountData,
+    ContractData,
+    SubscribeRequest,
+    OrderRequest,
+    CancelRequest
+)
+
+
+# 和实盘接口一样推送带时区的时间
+CHINA_TZ = ZoneInfo("Asia/Shanghai")
+
+# 合约模板：品种代码、交易所、名称、合约乘数、最小价格变动、初始价格
+PRODUCT_TEMPLATES: List[tuple] = [
+    ("IF", Exchange.CFFEX, "沪深300股指", 300, 0.2, 3800),
+    ("IC", Exchange.CFFEX, "中证500股指", 200, 0.2, 5600),
+    ("IH", Exchange.CFFEX, "上证50股指", 300, 0.2, 2600),
+    ("rb", Exchange.SHFE, "螺纹钢", 10, 1, 3700),
+    ("cu", Exchange.SHFE, "沪铜", 5, 10, 68000),
+    ("au", Exchange.SHFE, "黄金", 1000, 0.02, 460),
+    ("m", Exchange.DCE, "豆粕", 10, 1, 3400),
+    ("i", Exchange.DCE, "铁矿石", 100, 0.5, 850),
+    ("SR", Exchange.CZCE, "白糖", 10, 1, 6500),
+    ("TA", Exchange.CZCE, "PTA", 5, 2, 5800),
+]
+
+# 合约月份，合约数量超过品种数量时依次使用后续月份
+CONTRACT_MONTHS: List[str] = ["2401", "2402", "2403", "2404", "2405", "2406"]
+
+# 保证金率和手续费率
+MARGIN_RATE: float = 0.1
+COMMISSION_RATE: float = 0.0001
+
+# 盘口档位数
+DEPTH: int = 5
+
+
+class SimGateway(BaseGateway):
+    """本地模拟接口，用于离线测试"""
+    
+    default_name: str = "SIM"
+    
+    default_setting: Dict[str, int] = {
+        "合约数量": 10,
+        "行情频率": 2,
+        "初始资金": 1_000_000,
+        "自动订阅": 0
+    }
+    
+    exchanges: List[Exchange] = [Exchange.CFFEX, Exchange.SHFE, Exchange.DCE, Exchange.CZCE]
+    
+    def __init__(self, event_engine: EventEngine, gateway_name: str) -> None:
+        """构造函数"""
+        super().__init__(event_engine, gateway_name)
+        
+        self.contracts: Dict[str, ContractData] = {}
+        self.ticks: Dict[str, TickData] = {}
+        self.subscribed: Dict[str, TickData] = {}
+        
+        # 撮合引擎：每个合约买卖两侧按价格时间优先排序的挂单，元素为（排序价格，序号，委托）
+        self.bids: Dict[str, List[Tuple[float, int, OrderData]]] = {}
+        self.asks: Dict[str, List[Tuple[float, int, OrderData]]] = {}
+        
+        # 只保存未完成的委托，全部成交、撤单后移除，开销不随历史委托数量增长
+        self.active_orders: Dict[str, OrderData] = {}
+        
+        self.order_count: count = count(1)
+        self.trade_count: count = count(1)
+        
+        # 持仓和资金
+        self.positions: Dict[Tuple[str, Direction], PositionData] = {}
+        self.capital: float = 0
+        self.realized: float = 0
+        self.commission: float = 0
+        
+        # 所有撮合在模拟线程中串行执行
+        self.queue: Queue = Queue()
+        self.interval: float = 0.5
+        self.active: bool = False
+        self.thread: Thread = None
+    
+    def connect(self, setting: dict) -> None:
+        """连接模拟交易所（接受任意配置，缺少的参数使用默认值）"""
+        if self.active:
+            return
+        
+        contract_count: int = int(setting.get("合约数量", self.default_setting["合约数量"]))
+        tick_rate: float = float(setting.get("行情频率", self.default_setting["行情频率"]))
+        self.capital = float(setting.get("初始资金", self.default_setting["初始资金"]))
+        
+        self.interval = 1 / tick_rate
+        self.init_contracts(contract_count)
+        self.write_log(f"合约信息查询成功，共{len(self.contracts)}个合约")
+        
+        if int(setting.get("自动订阅", 0)):
+            for vt_symbol in self.contracts:
+                self.subscribed[vt_symbol] = self.ticks[vt_symbol]
+        
+        # 每次连接创建新线程，关闭后可以重新连接
+        self.active = True
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+        
+        self.query_account()
+        self.write_log("模拟交易所连接成功")
+    
+    def close(self) -> None:
+        """关闭连接"""
+        if not self.active:
+            return
+        
+        self.active = False
+        self.thread.join()
+    
+    def init_contracts(self, contract_count: int) -> None:
+        """生成合约和初始行情"""
+        for i in range(contract_count):
+            product, exchange, name, size, pricetick, price = PRODUCT_TEMPLATES[i % len(PRODUCT_TEMPLATES)]
+            month: str = CONTRACT_MONTHS[i // len(PRODUCT_TEMPLATES) % len(CONTRACT_MONTHS)]
+            
+            # 郑商所合约代码只有3位月份
+            if exchange == Exchange.CZCE:
+                symbol: str = product + month[1:]
+            else:
+                symbol: str = product + month
+            
+            contract: ContractData = ContractData(
+                gateway_name=self.gateway_name,
+                symbol=symbol,
+                exchange=exchange,
+                name=f"{name}{month}",
+                product=Product.FUTURES,
+                size=size,
+                pricetick=pricetick
+            )
+            self.contracts[contract.vt_symbol] = contract
+            self.on_contract(contract)
+            
+            self.ticks[contract.vt_symbol] = TickData(
+                gateway_name=self.gateway_name,
+                symbol=symbol,
+                exchange=exchange,
+                datetime=datetime.now(CHINA_TZ),
+                name=contract.name,
+                open_interest=random.randint(10000, 100000),
+                last_price=price,
+                open_price=price,
+                high_price=price,
+                low_price=price,
+                pre_close=price,
+                limit_up=round_to(price * 1.1, pricetick),
+                limit_down=round_to(price * 0.9, pricetick)
+            )
+            
+            self.bids[contract.vt_symbol] = []
+            self.asks[contract.vt_symbol] = []
+    
+    def subscribe(self, req: SubscribeRequest) -> None:
+        """订阅行情"""
+        tick: TickData = self.ticks.get(req.vt_symbol, None)
+        if tick:
+            self.subscribed[req.vt_symbol] = tick
+    
+    def send_order(self, req: OrderRequest) -> str:
+        """委托下单"""
+        orderid: str = str(next(self.order_count))
+        order: OrderData = req.create_order_data(orderid, self.gateway_name)
+        order.datetime = datetime.now(CHINA_TZ)
+        
+        self.on_order(copy(order))
+        
+        self.queue.put((self.process_order, (order,)))
+        return order.vt_orderid
+    
+    def cancel_order(self, req: CancelRequest) -> None:
+        """委托撤单"""
+        self.queue.put((self.process_cancel, (req,)))
+    
+    def query_account(self) -> None:
+        """查询资金"""
+        self.queue.put((self.push_account, ()))
+    
+    def query_position(self) -> None:
+        """查询持仓"""
+        self.queue.put((self.push_positions, ()))
+    
+    def run(self) -> None:
+        """模拟线程：处理委托请求，定时推送行情、资金和持仓"""
+        tick_time: float = perf_counter()
+        query_time: float = tick_time + 1
+        
+        while self.active:
+            try:
+                func, args = self.queue.get(timeout=max(tick_time - perf_counter(), 0))
+                func(*args)
+            except Empty:
+                pass
+            
+            now: float = perf_counter()
+            if now < tick_time:
+                continue
+            
+            self.update_ticks()
+            
+            # 处理不过来时不追赶，避免行情突发
+            tick_time += self.interval
+            if tick_time < now:
+                tick_time = now + self.interval
+            
+            # 每秒推送一次资金和持仓
+            if now >= query_time:
+                self.push_account()
+                self.push_positions()
+                query_time = now + 1
+    
+    def update_ticks(self) -> None:
+        """已订阅合约的价格随机游走一次，并撮合挂单"""
+        now: datetime = datetime.now(CHINA_TZ)
+        
+        for vt_symbol, tick in list(self.subscribed.items()):
+            contract: ContractData = self.contracts[vt_symbol]
+            pricetick: float = contract.pricetick
+            
+            # 以最小价格变动为单位随机游走，不超过涨跌停
+            price: float = tick.last_price + random.choice((-1, 0, 0, 1)) * pricetick
+            price = round_to(min(max(price, tick.limit_down), tick.limit_up - pricetick), pricetick)
+            
+            tick.datetime = now
+            tick.last_price = price
+            volume: int = random.randint(1, 50)
+            tick.volume += volume
+            tick.turnover += volume * price * contract.size
+            tick.open_interest += random.randint(-10, 10)
+            tick.high_price = max(tick.high_price, price)
+            tick.low_price = min(tick.low_price, price)
+            
+            # 买一为最新价，卖一高一个价位，各档价差一个价位
+            for i in range(1, DEPTH + 1):
+                setattr(tick, f"bid_price_{i}", round_to(price - (i - 1) * pricetick, pricetick))
+                setattr(tick, f"ask_price_{i}", round_to(price + i * pricetick, pricetick))
+                setattr(tick, f"bid_volume_{i}", random.randint(1, 100))
+                setattr(tick, f"ask_volume_{i}", random.randint(1, 100))
+            
+            self.on_tick(copy(tick))
+            
+            # 行情穿过挂单价格时，挂单以委托价成交
+            self.match_book(vt_symbol, tick)
+    
+    def process_order(self, order: OrderData) -> None:
+        """交易所收到委托：检查后立即撮合，剩余部分挂单"""
+        contract: ContractData = self.contracts.get(order.vt_symbol, None)
+        if not contract or order.type != OrderType.LIMIT:
+            self.reject_order(order, "不支持的合约或委托类型")
+            return
+        
+        if order.offset == Offset.OPEN:
+            margin: float = order.price * order.volume * contract.size * MARGIN_RATE
+            if margin > self.get_available():
+                self.reject_order(order, "可用资金不足")
+                return
+        else:
+            position: PositionData = self.get_position(order.vt_symbol, get_opposite(order.direction))
+            if order.volume > position.volume - position.frozen:
+                self.reject_order(order, "可平仓位不足")
+                return
+            position.frozen += order.volume
+        
+        order.status = Status.NOTTRADED
+        self.active_orders[order.vt_orderid] = order
+        self.on_order(copy(order))
+        
+        # 按盘口吃单成交
+        tick: TickData = self.ticks[order.vt_symbol]
+        self.match_order(order, tick)
+        
+        # 剩余部分按价格时间优先挂单
+        if order.is_active():
+            sequence: int = int(order.orderid)
+            if order.direction == Direction.LONG:
+                insort(self.bids[order.vt_symbol], (-order.price, sequence, order))
+            else:
+                insort(self.asks[order.vt_symbol], (order.price, sequence, order))
+    
+    def process_cancel(self, req: CancelRequest) -> None:
+        """撤销挂单"""
+        order: OrderData = self.active_orders.pop(f"{self.gateway_name}.{req.orderid}", None)
+        if not order:
+            return
+        
+        if order.direction == Direction.LONG:
+            book: list = self.bids[order.vt_symbol]
+        else:
+            book: list = self.asks[order.vt_symbol]
+        
+        for i, (_, _, book_order) in enumerate(book):
+            if book_order is order:
+                book.pop(i)
+                break
+        
+        self.release_frozen(order)
+        
+        order.status = Status.CANCELLED
+        self.on_order(copy(order))
+    
+    def reject_order(self, order: OrderData, reason: str) -> None:
+        """拒单"""
+        order.status = Status.REJECTED
+        self.on_order(copy(order))
+        self.write_log(f"委托{order.vt_orderid}拒单：{reason}")
+    
+    def match_order(self, order: OrderData, tick: TickData) -> None:
+        """新委托作为主动方，依次吃掉对手盘各档"""
+        for i in range(1, DEPTH + 1):
+            if order.direction == Direction.LONG:
+                price: float = getattr(tick, f"ask_price_{i}")
+                if not price or order.price < price:
+                    break
+                volume_name: str = f"ask_volume_{i}"
+            else:
+                price: float = getattr(tick, f"bid_price_{i}")
+                if not price or order.price > price:
+                    break
+                volume_name: str = f"bid_volume_{i}"
+            
+            level_volume: float = getattr(tick, volume_name)
+            volume: float = min(level_volume, order.volume - order.traded)
+            if not volume:
+                continue
+            
+            setattr(tick, volume_name, level_volume - volume)
+            self.fill_order(order, price, volume)
+            
+            if not order.is_active():
+                break
+    
+    def match_book(self, vt_symbol: str, tick: TickData) -> None:
+        """挂单作为被动方，按价格时间优先和新行情对手盘成交"""
+        # 买单和卖盘成交，卖单和买盘成交，盘口按从优到劣排列
+        ask_levels: List[list] = [
+            [getattr(tick, f"ask_price_{i}"), getattr(tick, f"ask_volume_{i}")]
+            for i in range(1, DEPTH + 1)
+        ]
+        self.match_side(self.bids[vt_symbol], ask_levels)
+        
+        bid_levels: List[list] = [
+            [getattr(tick, f"bid_price_{i}"), getattr(tick, f"bid_volume_{i}")]
+            for i in range(1, DEPTH + 1)
+        ]
+        self.match_side(self.asks[vt_symbol], bid_levels)
+    
+    def match_side(self, book: List[tuple], levels: List[list]) -> None:
+        """优先级最高的挂单先消耗最优档位，挂单以委托价成交"""
+        i: int = 0
+        
+        while book and i < len(levels):
+            order: OrderData = book[0][2]
+            price, volume = levels[i]
+            
+            if not volume:
+                i += 1
+                continue
+            
+            # 排在最前的挂单都无法成交，后面的更不能成交
+            if order.direction == Direction.LONG and price > order.price:
+                break
+            elif order.direction == Direction.SHORT and price < order.price:
+                break
+            
+            traded: float = min(volume, order.volume - order.traded)
+            levels[i][1] -= traded
+            self.fill_order(order, order.price, traded)
+            
+            if not order.is_active():
+                book.pop(0)
+    
+    def fill_order(self, order: OrderData, price: float, volume: float) -> None:
+        """成交后更新委托、持仓和资金，并推送"""
+        order.traded += volume
+        if order.traded >= order.volume:
+            order.status = Status.ALLTRADED
+            self.active_orders.pop(order.vt_orderid, None)
+        else:
+            order.status = Status.PARTTRADED
+        
+        trade: TradeData = TradeData(
+            gateway_name=self.gateway_name,
+            symbol=order.symbol,
+            exchange=order.exchange,
+            orderid=order.orderid,
+            tradeid=str(next(self.trade_count)),
+            direction=order.direction,
+            offset=order.offset,
+            price=price,
+            volume=volume,
+            datetime=datetime.now(CHINA_TZ)
+        )
+        
+        self.on_order(copy(order))
+        self.on_trade(trade)
+        
+        self.update_position(trade)
+        self.push_positions()
+        self.push_account()
+    
+    def update_position(self, trade: TradeData) -> None:
+        """根据成交更新持仓和已实现盈亏"""
+        contract: ContractData = self.contracts[trade.vt_symbol]
+        self.commission += trade.price * trade.volume * contract.size * COMMISSION_RATE
+        
+        # 开仓增加同方向持仓，更新持仓均价
+        if trade.offset == Offset.OPEN:
+            position: PositionData = self.get_position(trade.vt_symbol, trade.direction)
+            cost: float = position.price * position.volume + trade.price * trade.volume
+            position.volume += trade.volume
+            position.price = cost / position.volume
+            return
+        
+        # 平仓减少反方向持仓，计算平仓盈亏
+        position: PositionData = self.get_position(trade.vt_symbol, get_opposite(trade.direction))
+        position.volume -= trade.volume
+        position.frozen -= trade.volume
+        
+        if position.direction == Direction.LONG:
+            self.realized += (trade.price - position.price) * trade.volume * contract.size
+        else:
+            self.realized += (position.price - trade.price) * trade.volume * contract.size
+        
+        if not position.volume:
+            position.price = 0
+            position.pnl = 0
+    
+    def release_frozen(self, order: OrderData) -> None:
+        """撤单后释放平仓冻结"""
+        if order.offset == Offset.OPEN:
+            return
+        
+        position: PositionData = self.get_position(order.vt_symbol, get_opposite(order.direction))
+        position.frozen -= order.volume - order.traded
+    
+    def get_position(self, vt_symbol: str, direction: Direction) -> PositionData:
+        """获取持仓，不存在则创建"""
+        key: Tuple[str, Direction] = (vt_symbol, direction)
+        position: PositionData = self.positions.get(key, None)
+        
+        if not position:
+            contract: ContractData = self.contracts[vt_symbol]
+            position = PositionData(
+                gateway_name=self.gateway_name,
+                symbol=contract.symbol,
+                exchange=contract.exchange,
+                direction=direction
+            )
+            self.positions[key] = position
+        
+        return position
+    
+    def get_balance(self) -> Tuple[float, float]:
+        """计算动态权益和冻结资金（持仓保证金和开仓委托保证金）"""
+        balance: float = self.capital + self.realized - self.commission
+        frozen: float = 0
+        
+        for (vt_symbol, direction), position in self.positions.items():
+            if not position.volume:
+                continue
+            
+            size: float = self.contracts[vt_symbol].size
+            last_price: float = self.ticks[vt_symbol].last_price
+            
+            if direction == Direction.LONG:
+                position.pnl = (last_price - position.price) * position.volume * size
+            else:
+                position.pnl = (position.price - last_price) * position.volume * size
+            
+            balance += position.pnl
+            frozen += position.price * position.volume * size * MARGIN_RATE
+        
+        for order in self.active_orders.values():
+            if order.offset == Offset.OPEN:
+                size: float = self.contracts[order.vt_symbol].size
+                frozen += order.price * (order.volume - order.traded) * size * MARGIN_RATE
+        
+        return balance, frozen
+    
+    def get_available(self) -> float:
+        """计算可用资金"""
+        balance, frozen = self.get_balance()
+        return balance - frozen
+    
+    def push_account(self) -> None:
+        """推送资金"""
+        balance, frozen = self.get_balance()
+        
+        account: AccountData = AccountData(
+            gateway_name=self.gateway_name,
+            accountid="SIM",
+            balance=balance,
+            frozen=frozen
+        )
+        self.on_account(account)
+    
+    def push_positions(self) -> None:
+        """推送持仓"""
+        self.get_balance()
+        
+        for position in self.positions.values():
+            self.on_position(copy(position))
+
+
+def get_opposite(direction: Direction) -> Direction:
+    """获取反方向"""
+    if direction == Direction.LONG:
+        return Direction.SHORT
+    return Direction.LONG
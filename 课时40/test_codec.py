@@ -0,0 +1,86 @@
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from recorder import TICK_DTYPE, FLOAT_FIELDS
+from codec import KIND_FLOAT, KIND_PRICE, save_ticks, TickFile
+
+
+def make_columns(count: int, pricetick: float = 0.2) -> Dict[str, np.ndarray]:
+    """生成随机游走的行情列数据"""
+    rng = np.random.default_rng(0)
+    
+    columns: Dict[str, np.ndarray] = {name: np.zeros(count) for name in FLOAT_FIELDS}
+    columns["datetime"] = 1_700_000_000_000_000 + np.cumsum(rng.integers(1, 500_000, count))
+    
+    ticks: np.ndarray = 19000 + np.cumsum(rng.integers(-2, 3, count))
+    columns["last_price"] = np.round(ticks * pricetick, 8)
+    columns["bid_price_1"] = np.round((ticks - 1) * pricetick, 8)
+    columns["ask_price_1"] = np.round((ticks + 1) * pricetick, 8)
+    columns["volume"] = np.cumsum(rng.integers(0, 20, count)).astype(float)
+    columns["turnover"] = columns["volume"] * columns["last_price"] * 300.5
+    columns["bid_volume_1"] = rng.integers(1, 50, count).astype(float)
+    
+    return columns
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    """多个块的完整读取与原始数据一致"""
+    columns: Dict[str, np.ndarray] = make_columns(5000)
+    path: Path = tmp_path.joinpath("IF.CFFEX.tkz")
+    save_ticks(str(path), "IF.CFFEX", columns, 0.2, block_size=1024)
+    
+    tick_file: TickFile = TickFile(str(path))
+    assert tick_file.count == 5000
+    assert len(tick_file.index) == 5
+    
+    result: Dict[str, np.ndarray] = tick_file.read()
+    for name in TICK_DTYPE.names:
+        assert np.array_equal(result[name], columns[name]), name
+
+
+def test_read_range(tmp_path: Path) -> None:
+    """按时间范围读取只返回范围内的行"""
+    columns: Dict[str, np.ndarray] = make_columns(5000)
+    path: Path = tmp_path.joinpath("IF.CFFEX.tkz")
+    save_ticks(str(path), "IF.CFFEX", columns, 0.2, block_size=1024)
+    
+    timestamps: np.ndarray = columns["datetime"]
+    start, end = int(timestamps[1000]), int(timestamps[3100])
+    
+    result: Dict[str, np.ndarray] = TickFile(str(path)).read_range(start, end)
+    assert np.array_equal(result["datetime"], timestamps[1000:3101])
+    assert np.array_equal(result["last_price"], columns["last_price"][1000:3101])
+
+
+def test_read_range_across_block_boundary(tmp_path: Path) -> None:
+    """相同时间戳跨越块边界时不丢失数据"""
+    columns: Dict[str, np.ndarray] = make_columns(2048)
+    
+    timestamp: int = int(columns["datetime"][1020])
+    columns["datetime"][1020:1030] = timestamp
+    columns["datetime"][1030:] += 1
+    
+    path: Path = tmp_path.joinpath("IF.CFFEX.tkz")
+    save_ticks(str(path), "IF.CFFEX", columns, 0.2, block_size=1024)
+    
+    result: Dict[str, np.ndarray] = TickFile(str(path)).read_range(timestamp, timestamp)
+    assert len(result["datetime"]) == 10
+
+
+def test_off_tick_price(tmp_path: Path) -> None:
+    """不在价位上的价格列按原始浮点数保存"""
+    columns: Dict[str, np.ndarray] = make_columns(100)
+    columns["ask_price_1"][50] += 0.05
+    
+    path: Path = tmp_path.joinpath("IF.CFFEX.tkz")
+    save_ticks(str(path), "IF.CFFEX", columns, 0.2)
+    
+    tick_file: TickFile = TickFile(str(path))
+    kinds: Dict[str, str] = {name: kind for name, dtype, kind in tick_file.fields}
+    assert kinds["ask_price_1"] == KIND_FLOAT
+    assert kinds["bid_price_1"] == KIND_PRICE
+    
+    result: Dict[str, np.ndarray] = tick_file.read()
+    assert np.array_equal(result["ask_price_1"], columns["ask_price_1"])
@@ -0,0 +1,166 @@
+import sys
+import traceback
+from collections import deque
+from pathlib import Path
+from threading import Thread, get_ident
+from time import perf_counter, sleep
+from types import FrameType
+from typing import Deque, List, Set
+
+from PySide6 import QtCore
+
+from vnpy.trader.engine import MainEngine
+
+
+# 本程序代码所在目录，用于从调用栈中找出卡顿的处理函数
+APP_DIR: str = str(Path(__file__).parent)
+
+# 事件桥接的派发函数和性能分析包装函数，其下一层才是处理函数
+DISPATCH_NAMES: Set[str] = {"dispatch", "profiled"}
+
+
+def get_frame_name(frame: FrameType) -> str:
+    """获取栈帧的函数名（方法带上类名）"""
+    name: str = frame.f_code.co_name
+    
+    obj = frame.f_locals.get("self", None)
+    if obj is not None:
+        name = f"{obj.__class__.__name__}.{name}"
+    return name
+
+
+def get_handler_name(frame: FrameType) -> str:
+    """从调用栈中找出卡顿的处理函数"""
+    location: str = ""
+    
+    while frame:
+        code = frame.f_code
+        
+        if code.co_filename.startswith(APP_DIR) and code.co_name not in DISPATCH_NAMES:
+            name: str = get_frame_name(frame)
+            
+            # 最内层的本程序函数
+            if not location:
+                location = name
+            
+            # 由事件桥接派发的处理函数
+            caller: FrameType = frame.f_back
+            if caller and caller.f_code.co_name in DISPATCH_NAMES:
+                if name != location:
+                    return f"{name} -> {location}"
+                return name
+        
+        frame = frame.f_back
+    
+    return location
+
+
+class StallRecord:
+    """一次主线程卡顿的记录"""
+    
+    __slots__ = ("duration", "handler", "stack")
+    
+    def __init__(self, duration: float, handler: str, stack: List[str]) -> None:
+        """构造函数"""
+        self.duration: float = duration
+        self.handler: str = handler
+        self.stack: List[str] = stack
+
+
+class StallWatchdog(QtCore.QObject):
+    """GUI事件循环卡顿检测"""
+    
+    def __init__(
+        self,
+        main_engine: MainEngine,
+        threshold: float = 0.1,
+        interval: int = 20
+    ) -> None:
+        """构造函数"""
+        super().__init__()
+        
+        self.main_engine: MainEngine = main_engine
+        
+        # 卡顿阈值（秒）
+        self.threshold: float = threshold
+        
+        # 主线程心跳，事件循环卡住时停止更新
+        self.main_thread_id: int = get_ident()
+        self.beat_time: float = perf_counter()
+        
+        self.timer: QtCore.QTimer = QtCore.QTimer(self)
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.beat)
+        
+        # 监视线程在卡顿中抓取的（卡顿开始时的心跳时间，处理函数，调用栈）
+        self.capture: tuple = None
+        
+        self.active: bool = False
+        self.thread: Thread = Thread(target=self.run, daemon=True)
+        
+        # 最近的卡顿记录
+        self.stalls: Deque[StallRecord] = deque(maxlen=100)
+    
+    def start(self) -> None:
+        """启动监视（需要在主线程调用）"""
+        self.main_thread_id = get_ident()
+        self.beat_time = perf_counter()
+        
+        self.active = True
+        self.timer.start()
+        self.thread.start()
+    
+    def stop(self) -> None:
+        """停止监视"""
+        self.active = False
+        self.timer.stop()
+        self.thread.join()
+    
+    def beat(self) -> None:
+        """主线程心跳"""
+        now: float = perf_counter()
+        last_time: float = self.beat_time
+        self.beat_time = now
+        
+        duration: float = now - last_time
+        if duration < self.threshold:
+            return
+        
+        # 事件循环恢复，记录刚才的卡顿（只使用本次卡顿中抓取的调用栈）
+        capture: tuple = self.capture
+        if capture and capture[0] == last_time:
+            stall: StallRecord = StallRecord(duration, capture[1], capture[2])
+        else:
+            stall: StallRecord = StallRecord(duration, "", [])
+        self.stalls.append(stall)
+        
+        # 完整调用栈保存在卡顿记录中，日志只输出处理函数
+        self.main_engine.write_log(
+            f"界面卡顿{duration * 1000:.0f}ms，处理函数：{stall.handler or '未知'}",
+            "StallWatchdog"
+        )
+    
+    def run(self) -> None:
+        """检查主线程心跳（运行在监视线程）"""
+        check_interval: float = self.threshold / 4
+        
+        while self.active:
+            sleep(check_interval)
+            
+            beat_time: float = self.beat_time
+            if perf_counter() - beat_time < self.threshold:
+                continue
+            
+            # 每次卡顿只抓取一次调用栈
+            capture: tuple = self.capture
+            if capture and capture[0] == beat_time:
+                continue
+            
+            frame: FrameType = sys._current_frames().get(self.main_thread_id, None)
+            if not frame:
+                continue
+            
+            handler: str = get_handler_name(frame)
+            stack: List[str] = traceback.format_stack(frame)
+            self.capture = (beat_time, handler, stack)
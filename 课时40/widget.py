@@ -1,13 +1,39 @@
+from time import perf_counter
+from typing import List
+
 from PySide6 import QtWidgets, QtCore, QtGui
 
-from vnpy.event import EventEngine, Event
+from vnpy.event import Event
 from vnpy.trader.engine import MainEngine
+from vnpy.trader.event import EVENT_TICK
 from vnpy.trader.utility import load_json, save_json
 from vnpy.trader.constant import Exchange, Direction, Offset, OrderType
 from vnpy.trader.object import TickData, ContractData, SubscribeRequest, OrderRequest
-from vnpy.trader.event import EVENT_TICK
+
+from bridge import EventBridge
+from router import TickRouter
+from latency import OrderLatencyTracker, TickTracer, TRACE_STAGES
+from profiler import HandlerProfiler
 
 
+class TradingContext:
+    """交易代码上下文，绑定代码时一次性解析交易参数"""
+    
+    def __init__(self, contract: ContractData) -> None:
+        """构造函数"""
+        self.contract: ContractData = contract
+        
+        self.symbol: str = contract.symbol
+        self.exchange: Exchange = contract.exchange
+        self.vt_symbol: str = contract.vt_symbol
+        self.gateway_name: str = contract.gateway_name
+        self.pricetick: float = contract.pricetick
+        self.min_volume: float = contract.min_volume
+        
+        # 最新行情，由事件引擎线程直接更新
+        self.tick: TickData = None
+        
+
 class LoginDialog(QtWidgets.QDialog):
     """接口登录控件"""
     
@@ -93,11 +119,15 @@ class LoginDialog(QtWidgets.QDialog):
 class TradingWidget(QtWidgets.QWidget):
     """交易控件"""
     
-    def __init__(self, main_engine: MainEngine) -> None:
+    def __init__(self, main_engine: MainEngine, tracker: OrderLatencyTracker) -> None:
         """构造函数"""
         super().__init__()
         
         self.main_engine = main_engine
+        self.tracker = tracker
+        
+        # 当前交易代码的上下文，代码或交易所变化时失效
+        self.context: TradingContext = None
         
         self.init_ui()
         
@@ -105,28 +135,22 @@ class TradingWidget(QtWidgets.QWidget):
         """初始化界面"""
         self.symbol_line = QtWidgets.QLineEdit()
         self.symbol_line.returnPressed.connect(self.update_symbol)
+        self.symbol_line.textChanged.connect(self.clear_context)
+        
+        # 下拉框选项和枚举值按序号对应
+        self.exchanges = [Exchange.CFFEX, Exchange.SHFE, Exchange.DCE, Exchange.CZCE]
+        self.directions = [Direction.LONG, Direction.SHORT]
+        self.offsets = [Offset.OPEN, Offset.CLOSE, Offset.CLOSETODAY, Offset.CLOSEYESTERDAY]
         
         self.exchange_combo = QtWidgets.QComboBox()
-        self.exchange_combo.addItems([
-            Exchange.CFFEX.value,
-            Exchange.SHFE.value,
-            Exchange.DCE.value,
-            Exchange.CZCE.value
-        ])
+        self.exchange_combo.addItems([e.value for e in self.exchanges])
+        self.exchange_combo.currentIndexChanged.connect(self.clear_context)
         
         self.direction_combo = QtWidgets.QComboBox()
-        self.direction_combo.addItems([
-            Direction.LONG.value,
-            Direction.SHORT.value
-        ])
+        self.direction_combo.addItems([d.value for d in self.directions])
         
         self.offset_combo = QtWidgets.QComboBox()
-        self.offset_combo.addItems([
-            Offset.OPEN.value,
-            Offset.CLOSE.value,
-            Offset.CLOSETODAY.value,
-            Offset.CLOSEYESTERDAY.value
-        ])
+        self.offset_combo.addItems([o.value for o in self.offsets])
         
         self.price_spin = QtWidgets.QDoubleSpinBox()
         self.price_spin.setDecimals(3) # 设置成三位小数
@@ -154,24 +178,26 @@ class TradingWidget(QtWidgets.QWidget):
         
     def send_order(self) -> None:
         """发送委托"""
-        symbol = self.symbol_line.text()
-        exchange = Exchange(self.exchange_combo.currentText())
-        direction = Direction(self.direction_combo.currentText())
-        offset = Offset(self.offset_combo.currentText())
+        click_time = perf_counter()
+        
+        # 确认合约存在（未按回车绑定时在这里解析一次）
+        if not self.context:
+            self.update_symbol()
+            
+        context: TradingContext = self.context
+        if not context:
+            return
+        
+        direction = self.directions[self.direction_combo.currentIndex()]
+        offset = self.offsets[self.offset_combo.currentIndex()]
         price = self.price_spin.value()
         volume = self.volume_spin.value()
         order_type = OrderType.LIMIT
         
-        # 确认合约存在
-        vt_symbol = f"{symbol}.{exchange.value}"
-        contract = self.main_engine.get_contract(vt_symbol)
-        if not contract:
-            return
-        
         # 发送委托请求
         req = OrderRequest(
-            symbol=symbol,
-            exchange=exchange,
+            symbol=context.symbol,
+            exchange=context.exchange,
             direction=direction,
             type=order_type,
             volume=volume,
@@ -179,35 +205,48 @@ class TradingWidget(QtWidgets.QWidget):
             offset=offset
         )
         
-        self.main_engine.send_order(req, contract.gateway_name)
+        vt_orderid = self.main_engine.send_order(req, context.gateway_name)
+        self.tracker.add_order(vt_orderid, click_time)
         
     def update_symbol(self) -> None:
         """更新交易代码"""
         symbol = self.symbol_line.text()
-        exchange_str = self.exchange_combo.currentText()
-        vt_symbol = f"{symbol}.{exchange_str}"
+        exchange = self.exchanges[self.exchange_combo.currentIndex()]
+        vt_symbol = f"{symbol}.{exchange.value}"
         
         contract = self.main_engine.get_contract(vt_symbol)
         if contract:
             print("查询合约成功")
+            self.context = TradingContext(contract)
             self.price_spin.setSingleStep(contract.pricetick)
             self.volume_spin.setSingleStep(contract.min_volume)
+            
+    def clear_context(self) -> None:
+        """代码或交易所变化后清除上下文"""
+        self.context = None
       
             
 class FlashWidget(QtWidgets.QWidget):
     """闪电交易组件"""
     
-    signal = QtCore.Signal(Event)
-    
-    def __init__(self, main_engine: MainEngine, event_engine: EventEngine) -> None:
+    def __init__(
+        self,
+        main_engine: MainEngine,
+        bridge: EventBridge,
+        tracker: OrderLatencyTracker
+    ) -> None:
         """构造函数"""
         super().__init__()
         
         self.main_engine = main_engine
-        self.event_engine = event_engine
+        self.bridge = bridge
+        self.tracker = tracker
         
         self.vt_symbol = ""
         
+        # 当前交易代码的上下文
+        self.context: TradingContext = None
+        
         self.init_ui()
         self.init_shortcut()
         self.register_event()
@@ -228,8 +267,11 @@ class FlashWidget(QtWidgets.QWidget):
         self.add_spin.setSuffix("跳")
         self.add_spin.setRange(0, 100)
         
+        # 下拉框选项和开平枚举按序号对应
+        self.offsets = [o for o in Offset if o.value]
+        
         self.offset_combo = QtWidgets.QComboBox()
-        self.offset_combo.addItems([o.value for o in Offset if o.value])
+        self.offset_combo.addItems([o.value for o in self.offsets])
         
         height = 100
         self.bid_button = QtWidgets.QPushButton()
@@ -266,8 +308,8 @@ class FlashWidget(QtWidgets.QWidget):
     
     def register_event(self) -> None:
         """注册事件监听"""
-        self.signal.connect(self.process_tick_event)
-        self.event_engine.register(EVENT_TICK, self.signal.emit)
+        # 只接收当前交易代码的行情，在绑定代码时注册
+        self.router = TickRouter(self.bridge, self.process_tick_event)
     
     def update_symbol(self) -> None:
         """更新当前交易代码"""
@@ -284,60 +326,338 @@ class FlashWidget(QtWidgets.QWidget):
         req = SubscribeRequest(contract.symbol, contract.exchange)
         self.main_engine.subscribe(req, contract.gateway_name)
         
-        # 绑定代码
+        # 绑定代码，解析交易参数
+        self.context = TradingContext(contract)
+        self.context.tick = self.main_engine.get_tick(vt_symbol)
+        
+        # 下单价格用的行情直接在事件引擎线程更新，不受界面派发积压和丢弃的影响
+        event_engine = self.main_engine.event_engine
+        if self.vt_symbol:
+            event_engine.unregister(EVENT_TICK + self.vt_symbol, self.update_context_tick)
+        event_engine.register(EVENT_TICK + vt_symbol, self.update_context_tick)
+        
         self.vt_symbol = vt_symbol
+        self.router.set_symbols([vt_symbol])
+    
+    def update_context_tick(self, event: Event) -> None:
+        """更新上下文的最新行情（运行在事件引擎线程）"""
+        tick: TickData = event.data
+        
+        context: TradingContext = self.context
+        if context and context.vt_symbol == tick.vt_symbol:
+            context.tick = tick
     
     def process_tick_event(self, event: Event) -> None:
         """处理行情事件"""
         tick: TickData = event.data
-        if tick.vt_symbol != self.vt_symbol:
-            return
         
         self.bid_button.setText(f"{tick.bid_price_1}\n\n{tick.bid_volume_1}")
         self.ask_button.setText(f"{tick.ask_price_1}\n\n{tick.ask_volume_1}")
     
     def buy(self) -> None:
         """买入"""
-        # 查询最新行情
-        tick: TickData = self.main_engine.get_tick(self.vt_symbol)
-        if not tick:
+        click_time = perf_counter()
+        
+        # 使用缓存的最新行情
+        context: TradingContext = self.context
+        if not context or not context.tick:
             return
         
         # 计算委托价格
-        contract: ContractData = self.main_engine.get_contract(self.vt_symbol)
-        price = tick.ask_price_1 + contract.pricetick * self.add_spin.value()
+        price = context.tick.ask_price_1 + context.pricetick * self.add_spin.value()
         
         # 发出交易委托
         req = OrderRequest(
-            symbol=tick.symbol,
-            exchange=tick.exchange,
+            symbol=context.symbol,
+            exchange=context.exchange,
             direction=Direction.LONG,
             type=OrderType.LIMIT,
-            offset=Offset(self.offset_combo.currentText()),
+            offset=self.offsets[self.offset_combo.currentIndex()],
             volume=self.volume_spin.value(),
             price=price
         )
-        self.main_engine.send_order(req, tick.gateway_name)
+        vt_orderid = self.main_engine.send_order(req, context.gateway_name)
+        self.tracker.add_order(vt_orderid, click_time)
     
     def sell(self) -> None:
         """卖出"""
-        # 查询最新行情
-        tick: TickData = self.main_engine.get_tick(self.vt_symbol)
-        if not tick:
+        click_time = perf_counter()
+        
+        # 使用缓存的最新行情
+        context: TradingContext = self.context
+        if not context or not context.tick:
             return
         
         # 计算委托价格
-        contract: ContractData = self.main_engine.get_contract(self.vt_symbol)
-        price = tick.bid_price_1 - contract.pricetick * self.add_spin.value()
+        price = context.tick.bid_price_1 - context.pricetick * self.add_spin.value()
         
         # 发出交易委托
         req = OrderRequest(
-            symbol=tick.symbol,
-            exchange=tick.exchange,
+            symbol=context.symbol,
+            exchange=context.exchange,
             direction=Direction.SHORT,
             type=OrderType.LIMIT,
-            offset=Offset(self.offset_combo.currentText()),
+            offset=self.offsets[self.offset_combo.currentIndex()],
             volume=self.volume_spin.value(),
             price=price
         )
-        self.main_engine.send_order(req, tick.gateway_name)
+        vt_orderid = self.main_engine.send_order(req, context.gateway_name)
+        self.tracker.add_order(vt_orderid, click_time)
+
+
+class StatsWidget(QtWidgets.QWidget):
+    """每秒刷新一次的统计表格控件"""
+    
+    def init_table(
+        self,
+        headers: List[str],
+        resize_mode: QtWidgets.QHeaderView.ResizeMode
+    ) -> None:
+        """创建统计表格并启动刷新定时器"""
+        self.headers: List[str] = headers
+        
+        self.table = QtWidgets.QTableWidget()
+        self.table.setColumnCount(len(self.headers))
+        self.table.setHorizontalHeaderLabels(self.headers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(resize_mode)
+        
+        # 每秒刷新一次统计
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self.update_stats)
+        self.timer.start(1000)
+        
+    def update_stats(self) -> None:
+        """刷新统计（由子类实现）"""
+        pass
+        
+    def set_rows(self, rows: List[List[str]]) -> None:
+        """更新表格文字，复用已有的单元格"""
+        self.table.setRowCount(len(rows))
+        
+        for row, texts in enumerate(rows):
+            for column, text in enumerate(texts):
+                item = self.table.item(row, column)
+                if not item:
+                    item = QtWidgets.QTableWidgetItem()
+                    item.setTextAlignment(QtCore.Qt.AlignCenter)
+                    self.table.setItem(row, column, item)
+                item.setText(text)
+
+
+class LatencyWidget(StatsWidget):
+    """委托延时统计控件"""
+    
+    def __init__(self, tracker: OrderLatencyTracker) -> None:
+        """构造函数"""
+        super().__init__()
+        
+        self.tracker = tracker
+        
+        self.init_ui()
+        
+    def init_ui(self) -> None:
+        """初始化界面"""
+        self.init_table(
+            ["阶段", "笔数", "p50(ms)", "p99(ms)", "max(ms)"],
+            QtWidgets.QHeaderView.ResizeMode.Stretch
+        )
+        
+        clear_button = QtWidgets.QPushButton("清空")
+        clear_button.clicked.connect(self.clear)
+        
+        export_button = QtWidgets.QPushButton("导出CSV")
+        export_button.clicked.connect(self.export_csv)
+        
+        hbox = QtWidgets.QHBoxLayout()
+        hbox.addStretch()
+        hbox.addWidget(clear_button)
+        hbox.addWidget(export_button)
+        
+        vbox = QtWidgets.QVBoxLayout()
+        vbox.addWidget(self.table)
+        vbox.addLayout(hbox)
+        self.setLayout(vbox)
+        
+        self.update_stats()
+        
+    def update_stats(self) -> None:
+        """刷新各阶段延时分位数"""
+        # 隐藏时不做统计
+        if not self.isVisible() and self.table.rowCount():
+            return
+        
+        rows: List[List[str]] = []
+        
+        for stats in self.tracker.get_stats():
+            rows.append([
+                stats["name"],
+                str(stats["count"]),
+                f"{stats['p50']:.2f}",
+                f"{stats['p99']:.2f}",
+                f"{stats['max']:.2f}"
+            ])
+        
+        self.set_rows(rows)
+        
+    def clear(self) -> None:
+        """清空统计"""
+        self.tracker.clear()
+        self.update_stats()
+        
+    def export_csv(self) -> None:
+        """导出每笔委托的延时数据"""
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "导出委托延时", "order_latency.csv", "CSV(*.csv)"
+        )
+        if not path:
+            return
+        
+        count = self.tracker.save_csv(path)
+        QtWidgets.QMessageBox.information(self, "导出完成", f"已导出{count}笔委托的延时数据")
+
+
+class TraceWidget(StatsWidget):
+    """行情延时追踪控件"""
+    
+    def __init__(self, tracer: TickTracer) -> None:
+        """构造函数"""
+        super().__init__()
+        
+        self.tracer = tracer
+        
+        self.init_ui()
+        
+    def init_ui(self) -> None:
+        """初始化界面"""
+        headers: List[str] = ["事件类型", "控件", "样本数"]
+        headers.extend([f"{stage} p50/p99(ms)" for stage in TRACE_STAGES])
+        self.init_table(headers, QtWidgets.QHeaderView.ResizeMode.ResizeToContents)
+        
+        # 抽样间隔，0表示关闭
+        self.rate_spin = QtWidgets.QSpinBox()
+        self.rate_spin.setRange(0, 100000)
+        self.rate_spin.setValue(self.tracer.sample_rate)
+        self.rate_spin.setSpecialValueText("关闭")
+        self.rate_spin.valueChanged.connect(self.tracer.set_sample_rate)
+        
+        clear_button = QtWidgets.QPushButton("清空")
+        clear_button.clicked.connect(self.clear)
+        
+        hbox = QtWidgets.QHBoxLayout()
+        hbox.addWidget(QtWidgets.QLabel("抽样间隔"))
+        hbox.addWidget(self.rate_spin)
+        hbox.addStretch()
+        hbox.addWidget(clear_button)
+        
+        vbox = QtWidgets.QVBoxLayout()
+        vbox.addWidget(self.table)
+        vbox.addLayout(hbox)
+        self.setLayout(vbox)
+        
+    def update_stats(self) -> None:
+        """刷新各事件类型和控件的延时分位数"""
+        all_stats: List[dict] = self.tracer.get_stats()
+        
+        # 隐藏时不刷新表格
+        if not self.isVisible():
+            return
+        
+        rows: List[List[str]] = []
+        
+        for stats in all_stats:
+            texts: List[str] = [stats["type"], stats["widget"], str(stats["count"])]
+            for stage in TRACE_STAGES:
+                p50, p99 = stats[stage]
+                texts.append(f"{p50:.2f} / {p99:.2f}")
+            rows.append(texts)
+        
+        self.set_rows(rows)
+        
+    def clear(self) -> None:
+        """清空统计"""
+        self.tracer.clear()
+        self.table.setRowCount(0)
+
+
+class ProfilerWidget(StatsWidget):
+    """事件处理函数耗时统计控件"""
+    
+    def __init__(self, profiler: HandlerProfiler) -> None:
+        """构造函数"""
+        super().__init__()
+        
+        self.profiler = profiler
+        
+        self.init_ui()
+        
+    def init_ui(self) -> None:
+        """初始化界面"""
+        headers: List[str] = [
+            "事件类型",
+            "处理函数",
+            "调用次数",
+            "次/秒",
+            "耗时ms/秒",
+            "总耗时(ms)",
+            "平均(ms)",
+            "最大(ms)"
+        ]
+        self.init_table(headers, QtWidgets.QHeaderView.ResizeMode.ResizeToContents)
+        
+        clear_button = QtWidgets.QPushButton("清空")
+        clear_button.clicked.connect(self.clear)
+        
+        export_button = QtWidgets.QPushButton("导出JSON")
+        export_button.clicked.connect(self.export_json)
+        
+        hbox = QtWidgets.QHBoxLayout()
+        hbox.addStretch()
+        hbox.addWidget(clear_button)
+        hbox.addWidget(export_button)
+        
+        vbox = QtWidgets.QVBoxLayout()
+        vbox.addWidget(self.table)
+        vbox.addLayout(hbox)
+        self.setLayout(vbox)
+        
+    def update_stats(self) -> None:
+        """刷新各处理函数的耗时统计"""
+        all_stats: List[dict] = self.profiler.get_stats()
+        
+        # 隐藏时不刷新表格
+        if not self.isVisible():
+            return
+        
+        rows: List[List[str]] = []
+        
+        for stats in all_stats:
+            rows.append([
+                stats["type"],
+                stats["handler"],
+                str(stats["count"]),
+                f"{stats['rate']:.0f}",
+                f"{stats['load']:.2f}",
+                f"{stats['total']:.1f}",
+                f"{stats['mean']:.3f}",
+                f"{stats['max']:.2f}"
+            ])
+        
+        self.set_rows(rows)
+        
+    def clear(self) -> None:
+        """清空统计"""
+        self.profiler.clear()
+        self.update_stats()
+        
+    def export_json(self) -> None:
+        """导出累计的耗时统计"""
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "导出处理函数耗时", "handler_profile.json", "JSON(*.json)"
+        )
+        if not path:
+            return
+        
+        self.profiler.save_json(path)
+        QtWidgets.QMessageBox.information(self, "导出完成", f"已导出到{path}")